@@ -99,12 +99,9 @@ create or replace TABLE FLATTENED_RESUME_PDFS (
 	VECTOR_EMBEDDING_VARIANT VARIANT
 );
 create or replace TABLE GOLD_TABLE_COMPARISONS (
-	FILE_URL_CLICKABLE VARCHAR(16777216),
 	REQ_ID VARCHAR(16777216),
 	JOB_TITLE VARCHAR(16777216),
 	RESUME_ID VARCHAR(16777216),
-	VECTOR_EMBEDDING_VARIANT VARIANT,
-	VECTOR_EMBEDDING_VARIANT_JOBREQ VARIANT,
 	RESUME_TECH_SKILLS VARCHAR(16777216),
 	RESUME_YOE NUMBER(38,0),
 	REQ_TECH_SKILLS VARCHAR(16777216),
@@ -125,7 +122,32 @@ create or replace TABLE GOLD_TABLE_COMPARISONS (
 	RANK_WITHIN_REQ NUMBER(18,0),
 	FIRSTNAME_LASTNAME VARCHAR(16777216)
 );
+create or replace TABLE RESUME_EMBEDDINGS (
+	RESUME_ID VARCHAR(16777216),
+	TEXT_HASH NUMBER(38,0),
+	EMBEDDING VECTOR(FLOAT, 1024)
+);
+create or replace TABLE REQ_EMBEDDINGS (
+	REQ_ID VARCHAR(16777216),
+	TEXT_HASH NUMBER(38,0),
+	EMBEDDING VECTOR(FLOAT, 1024)
+);
+create or replace TABLE JOBS_DIM (
+	REQ_ID VARCHAR(16777216),
+	JOB_TITLE VARCHAR(16777216),
+	CATEGORY VARCHAR(16777216),
+	DEPARTMENT VARCHAR(16777216),
+	REQ_TECH_SKILLS VARCHAR(16777216),
+	SKILLS VARIANT,
+	CANDIDATE_COUNT NUMBER(18,0)
+);
+-- Kept across reruns; "05 - Load into Gold layer.sql" seeds its rows
+create TABLE if not exists DEPARTMENTS (
+	CATEGORY VARCHAR(16777216),
+	DEPARTMENT VARCHAR(16777216)
+);
 create or replace TABLE JOBREQ_FLATTENED (
+	EXTRACTION_TIMESTAMP TIMESTAMP_LTZ(9),
 	REQ_ID VARCHAR(16777216),
 	CATEGORY VARCHAR(16777216),
 	JOB_TITLE VARCHAR(16777216),
@@ -49,7 +49,7 @@ SELECT * FROM hackathon_2025.jobreqs.jobreq_extractions;
 CREATE OR REPLACE TABLE jobreq_flattened AS (
 WITH parsed_data AS (
   SELECT 
-    -- extraction_timestamp,
+    extraction_timestamp,
     REQ_ID,
     CATEGORY,
     extracted_info,
@@ -100,8 +100,8 @@ WITH parsed_data AS (
 )
 
 SELECT 
-  -- Extraction metadata
-  -- extraction_timestamp,
+  -- Extraction metadata (watermark for the incremental gold refresh)
+  extraction_timestamp,
   
   -- Original job posting information (all columns from SILVER_JOB_LISTINGS_FLATTENED)
   
@@ -1,39 +1,151 @@
+-- Embeddings are computed once per resume and once per req and stored as fixed-width VECTORs;
+-- the gold table carries the match score and the descriptive columns but no vectors, and
+-- VECTOR_COSINE_SIMILARITY replaces the per-pair AI_SIMILARITY call that re-embedded both
+-- TO_VARCHAR'd objects for every resume x req pair.
+-- The tables are kept across runs: each MERGE embeds only ids that are new or whose embedded
+-- text changed (TEXT_HASH), so a rebuild does not pay EMBED_TEXT_1024 for the whole corpus again.
+-- scoring.py produces the same table locally, keeping its vectors in embedding_store.py stores.
+CREATE TABLE IF NOT EXISTS RESUME_EMBEDDINGS (
+    RESUME_ID VARCHAR,
+    TEXT_HASH NUMBER,
+    EMBEDDING VECTOR(FLOAT, 1024)
+);
+-- Tables created by earlier versions of this script have no TEXT_HASH; their rows are embedded once more
+ALTER TABLE RESUME_EMBEDDINGS ADD COLUMN IF NOT EXISTS TEXT_HASH NUMBER;
+
+MERGE INTO RESUME_EMBEDDINGS T
+USING (
+    SELECT S.RESUME_ID, S.TEXT_HASH,
+           SNOWFLAKE.CORTEX.EMBED_TEXT_1024('nv-embed-qa-4', S.TEXT) AS EMBEDDING
+    FROM (
+        SELECT RESUME_ID,
+               TO_VARCHAR(VECTOR_EMBEDDING_VARIANT) AS TEXT,
+               HASH(TO_VARCHAR(VECTOR_EMBEDDING_VARIANT)) AS TEXT_HASH
+        FROM HACKATHON_2025.JOE.FLATTENED_RESUME_PDFS
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY RESUME_ID ORDER BY EXTRACTION_TIMESTAMP DESC) = 1
+    ) S
+    LEFT JOIN RESUME_EMBEDDINGS E
+        ON E.RESUME_ID = S.RESUME_ID
+    -- Only new or changed resumes reach the embedding call
+    WHERE E.RESUME_ID IS NULL OR E.TEXT_HASH IS DISTINCT FROM S.TEXT_HASH
+) U
+ON T.RESUME_ID = U.RESUME_ID
+WHEN MATCHED THEN UPDATE SET TEXT_HASH = U.TEXT_HASH, EMBEDDING = U.EMBEDDING
+WHEN NOT MATCHED THEN INSERT (RESUME_ID, TEXT_HASH, EMBEDDING) VALUES (U.RESUME_ID, U.TEXT_HASH, U.EMBEDDING);
+
+CREATE TABLE IF NOT EXISTS REQ_EMBEDDINGS (
+    REQ_ID VARCHAR,
+    TEXT_HASH NUMBER,
+    EMBEDDING VECTOR(FLOAT, 1024)
+);
+ALTER TABLE REQ_EMBEDDINGS ADD COLUMN IF NOT EXISTS TEXT_HASH NUMBER;
+
+MERGE INTO REQ_EMBEDDINGS T
+USING (
+    SELECT S.REQ_ID, S.TEXT_HASH,
+           SNOWFLAKE.CORTEX.EMBED_TEXT_1024('nv-embed-qa-4', S.TEXT) AS EMBEDDING
+    FROM (
+        SELECT REQ_ID,
+               TO_VARCHAR(VECTOR_EMBEDDING_VARIANT_JOBREQ) AS TEXT,
+               HASH(TO_VARCHAR(VECTOR_EMBEDDING_VARIANT_JOBREQ)) AS TEXT_HASH
+        FROM HACKATHON_2025.JOE.JOBREQ_FLATTENED
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY REQ_ID ORDER BY EXTRACTION_TIMESTAMP DESC) = 1
+    ) S
+    LEFT JOIN REQ_EMBEDDINGS E
+        ON E.REQ_ID = S.REQ_ID
+    WHERE E.REQ_ID IS NULL OR E.TEXT_HASH IS DISTINCT FROM S.TEXT_HASH
+) U
+ON T.REQ_ID = U.REQ_ID
+WHEN MATCHED THEN UPDATE SET TEXT_HASH = U.TEXT_HASH, EMBEDDING = U.EMBEDDING
+WHEN NOT MATCHED THEN INSERT (REQ_ID, TEXT_HASH, EMBEDDING) VALUES (U.REQ_ID, U.TEXT_HASH, U.EMBEDDING);
+
 -- Fixed comparison query with proper window function usage
+-- The similarity is evaluated once per pair in the inner query and the window ranks on that column.
+-- Resume links are not stored: the app presigns FILE_PATH for the cards it renders (links.py),
+-- so the build no longer pays for URLs nobody opens, and links cannot go stale between rebuilds.
 CREATE OR REPLACE TABLE GOLD_TABLE_COMPARISONS AS (
 SELECT 
-    GET_PRESIGNED_URL('@REQS_RESUMES',FILE_PATH) AS FILE_URL_CLICKABLE,
-    JD.REQ_ID,
-    JD.JOB_TITLE,
-    JB.RESUME_ID,
-    JB.VECTOR_EMBEDDING_VARIANT,
-    JD.VECTOR_EMBEDDING_VARIANT_JOBREQ,
-    JB.TECHNICAL_SKILLS as RESUME_TECH_SKILLS,
-    JB.YEARS_OF_EXPERIENCE as RESUME_YOE,
-    JD.TECHNICAL_SKILLS_REQUIRED as REQ_TECH_SKILLS,
-    JD.YEARS_OF_EXPERIENCE_REQUIRED AS REQ_YOE,
-    JB.MOST_RECENT_JOB_TITLE AS RESUME_CURRENT_JOB,
-    JD.JOB_TITLE AS RESUME_JOB_TITLE,
-    AI_SIMILARITY(TO_VARCHAR(JB.VECTOR_EMBEDDING_VARIANT),TO_VARCHAR(JD.VECTOR_EMBEDDING_VARIANT_JOBREQ),{'model': 'nv-embed-qa-4'}) as match_score,
-    JB.FILE_PATH,
-    JB.FILE_URL,
-    JD.CATEGORY,  -- Fixed typo from CAETGORY and removed duplicate
-    JB.COMMUNITY_VOLUNTEER_BOOL,
-    JB.COMMUNITY_VOLUNTEER,
-    JB.college_sports,
-    JB.college_sports_division,
-    JB.interesting,
-    JB.personal_interests,
-    JB.spoken_languages,
+    *,
     -- Add ranking within each REQ_ID by match_score
-    ROW_NUMBER() OVER (PARTITION BY JD.REQ_ID ORDER BY AI_SIMILARITY(TO_VARCHAR(JB.VECTOR_EMBEDDING_VARIANT),TO_VARCHAR(JD.VECTOR_EMBEDDING_VARIANT_JOBREQ),{'model': 'nv-embed-qa-4'}) DESC) as rank_within_req
-FROM HACKATHON_2025.JOE.FLATTENED_RESUME_PDFS JB
-INNER JOIN HACKATHON_2025.JOE.JOBREQ_FLATTENED JD
-    ON JB.CATEGORY = JD.REQ_ID
-ORDER BY JD.REQ_ID, match_score DESC
+    ROW_NUMBER() OVER (PARTITION BY REQ_ID ORDER BY match_score DESC) as rank_within_req
+FROM (
+    SELECT 
+        JD.REQ_ID,
+        JD.JOB_TITLE,
+        JB.RESUME_ID,
+        JB.TECHNICAL_SKILLS as RESUME_TECH_SKILLS,
+        JB.YEARS_OF_EXPERIENCE as RESUME_YOE,
+        JD.TECHNICAL_SKILLS_REQUIRED as REQ_TECH_SKILLS,
+        JD.YEARS_OF_EXPERIENCE_REQUIRED AS REQ_YOE,
+        JB.MOST_RECENT_JOB_TITLE AS RESUME_CURRENT_JOB,
+        JD.JOB_TITLE AS RESUME_JOB_TITLE,
+        VECTOR_COSINE_SIMILARITY(RE.EMBEDDING, QE.EMBEDDING) as match_score,
+        JB.FILE_PATH,
+        JB.FILE_URL,
+        JD.CATEGORY,  -- Fixed typo from CAETGORY and removed duplicate
+        JB.COMMUNITY_VOLUNTEER_BOOL,
+        JB.COMMUNITY_VOLUNTEER,
+        JB.college_sports,
+        JB.college_sports_division,
+        JB.interesting,
+        JB.personal_interests,
+        JB.spoken_languages
+    FROM HACKATHON_2025.JOE.FLATTENED_RESUME_PDFS JB
+    INNER JOIN HACKATHON_2025.JOE.JOBREQ_FLATTENED JD
+        ON JB.CATEGORY = JD.REQ_ID
+    INNER JOIN RESUME_EMBEDDINGS RE
+        ON RE.RESUME_ID = JB.RESUME_ID
+    INNER JOIN REQ_EMBEDDINGS QE
+        ON QE.REQ_ID = JD.REQ_ID
+)
+ORDER BY REQ_ID, match_score DESC
 );
 
 ALTER TABLE GOLD_TABLE_COMPARISONS ADD FIRSTNAME_LASTNAME VARCHAR;
 
+-- Department display names for raw CATEGORY values; categories without a row keep their raw value.
+-- The MERGE seeds the standard names (jobs_dimension.DEPARTMENT_NAMES mirrors them for local builds)
+-- and leaves any other rows added to the table alone. The app reads the mapping back from JOBS_DIM.
+CREATE TABLE IF NOT EXISTS DEPARTMENTS (
+    CATEGORY VARCHAR,
+    DEPARTMENT VARCHAR
+);
+
+MERGE INTO DEPARTMENTS T
+USING (
+    SELECT COLUMN1 AS CATEGORY, COLUMN2 AS DEPARTMENT
+    FROM VALUES
+        ('MECHANICALCHEMICALQUALITYENGINEERING', 'Core_Engg'),
+        ('IT', 'Engineering')
+) S
+ON T.CATEGORY = S.CATEGORY
+WHEN MATCHED THEN UPDATE SET DEPARTMENT = S.DEPARTMENT
+WHEN NOT MATCHED THEN INSERT (CATEGORY, DEPARTMENT) VALUES (S.CATEGORY, S.DEPARTMENT);
+
+-- Jobs dimension: one row per REQ_ID, so the app lists jobs and departments without
+-- a SELECT DISTINCT over every resume x req pair. Rebuild it whenever the gold table is rebuilt;
+-- incremental_gold.py keeps it in step with incremental refreshes.
+CREATE OR REPLACE TABLE JOBS_DIM AS (
+SELECT
+    G.REQ_ID,
+    ANY_VALUE(G.JOB_TITLE) AS JOB_TITLE,
+    ANY_VALUE(G.CATEGORY) AS CATEGORY,
+    COALESCE(ANY_VALUE(D.DEPARTMENT), ANY_VALUE(G.CATEGORY)) AS DEPARTMENT,
+    ANY_VALUE(G.REQ_TECH_SKILLS) AS REQ_TECH_SKILLS,
+    -- Skills parsed once here: a JSON array as-is, otherwise comma-separated text split and trimmed
+    IFF(STARTSWITH(ANY_VALUE(G.REQ_TECH_SKILLS), '['),
+        TRY_PARSE_JSON(ANY_VALUE(G.REQ_TECH_SKILLS)),
+        FILTER(TRANSFORM(SPLIT(ANY_VALUE(G.REQ_TECH_SKILLS), ','), s -> TRIM(s::STRING)), s -> s <> '')
+    ) AS SKILLS,
+    COUNT(*) AS CANDIDATE_COUNT
+FROM GOLD_TABLE_COMPARISONS G
+LEFT JOIN DEPARTMENTS D
+    ON D.CATEGORY = G.CATEGORY
+WHERE G.REQ_ID IS NOT NULL
+GROUP BY G.REQ_ID
+ORDER BY G.REQ_ID
+);
+
 SELECT * FROM GOLD_TABLE_COMPARISONS;
 
 -- Alternative version if you want to filter to top N candidates per req:
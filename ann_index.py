@@ -0,0 +1,178 @@
+"""Persistent IVF (inverted file) index over resume embeddings, stored as memory-mapped files"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_sources import RESUME_TABLE
+from scoring import JOBREQ_EMBEDDING_FIELDS, RESUME_EMBEDDING_FIELDS, entity_texts, entity_vectors
+
+META_FILE = 'meta.json'
+CENTROIDS_FILE = 'centroids.npy'
+VECTORS_FILE = 'vectors.f32'
+ASSIGN_FILE = 'assign.i32'
+ALIVE_FILE = 'alive.u8'
+IDS_FILE = 'ids.txt'
+
+
+def train_centroids(vectors, nlist, iterations=10, seed=0):
+    """Spherical k-means on (a sample of) unit vectors"""
+    rng = np.random.default_rng(seed)
+    sample = vectors
+    if len(vectors) > nlist * 256:
+        sample = vectors[rng.choice(len(vectors), nlist * 256, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = ~np.bincount(assign, minlength=nlist).astype(bool)
+        # Re-seed empty lists from random points so every list stays usable
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """Top-k cosine search over unit vectors; nprobe trades recall for latency (nprobe=nlist is exact)"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.dim = self.meta['dim']
+        self.count = self.meta['count']
+        self.centroids = np.load(os.path.join(path, CENTROIDS_FILE))
+        self._map_files(self.meta['capacity'])
+        with open(os.path.join(path, IDS_FILE)) as f:
+            self.ids = [line.rstrip('\n') for line in f][:self.count]
+        self.rows = {item_id: row for row, item_id in enumerate(self.ids) if self.alive[row]}
+        self._build_lists()
+
+    @classmethod
+    def create(cls, path, ids, vectors, nlist=None, iterations=10, seed=0):
+        """Train centroids on the given vectors and write a new index to path"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if nlist is None:
+            nlist = max(1, min(len(vectors), int(4 * np.sqrt(len(vectors)))))
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, CENTROIDS_FILE), train_centroids(vectors, nlist, iterations, seed))
+        cls._write_meta(path, {'dim': vectors.shape[1], 'nlist': nlist, 'count': 0, 'capacity': 0})
+        for name in (VECTORS_FILE, ASSIGN_FILE, ALIVE_FILE, IDS_FILE):
+            open(os.path.join(path, name), 'wb').close()
+        index = cls(path)
+        index.add(ids, vectors)
+        return index
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, ids, vectors):
+        """Insert or replace vectors by id"""
+        ids = [str(item_id) for item_id in ids]
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        self.remove([item_id for item_id in ids if item_id in self.rows])
+        start, stop = self.count, self.count + len(ids)
+        if stop > self.meta['capacity']:
+            self._grow(max(stop, 2 * self.meta['capacity'], 1024))
+        assign = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32) if len(ids) else np.zeros(0, np.int32)
+        self.vectors[start:stop] = vectors
+        self.assign[start:stop] = assign
+        self.alive[start:stop] = 1
+        with open(os.path.join(self.path, IDS_FILE), 'a') as f:
+            f.writelines(item_id + '\n' for item_id in ids)
+        self.ids.extend(ids)
+        self.rows.update(zip(ids, range(start, stop)))
+        for list_id in np.unique(assign):
+            new_rows = np.arange(start, stop)[assign == list_id]
+            self.lists[list_id] = np.concatenate([self.lists[list_id], new_rows])
+        self.count = stop
+        self.flush()
+
+    def remove(self, ids):
+        """Tombstone vectors by id; their rows are skipped at query time"""
+        rows = [self.rows.pop(str(item_id)) for item_id in ids if str(item_id) in self.rows]
+        if rows:
+            self.alive[rows] = 0
+            self.flush()
+        return len(rows)
+
+    def search(self, query, k=10, nprobe=8):
+        """(ids, scores) of the k nearest vectors to one query vector, best first"""
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        nprobe = min(nprobe, len(self.centroids))
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        rows = np.concatenate([self.lists[list_id] for list_id in probe])
+        rows = rows[self.alive[rows].astype(bool)]
+        if not len(rows):
+            return [], np.zeros(0, dtype=np.float32)
+        scores = self.vectors[rows] @ query
+        if k < len(rows):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [self.ids[row] for row in rows[top]], scores[top]
+
+    def search_many(self, queries, k=10, nprobe=8):
+        return [self.search(query, k, nprobe) for query in np.asarray(queries, dtype=np.float32)]
+
+    def flush(self):
+        self.vectors.flush()
+        self.assign.flush()
+        self.alive.flush()
+        self.meta['count'] = self.count
+        self._write_meta(self.path, self.meta)
+
+    def _build_lists(self):
+        assign = np.asarray(self.assign[:self.count])
+        order = np.argsort(assign, kind='stable')
+        bounds = np.searchsorted(assign[order], np.arange(len(self.centroids) + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+
+    def _map_files(self, capacity):
+        shape = (max(capacity, 1),)
+        self.vectors = np.memmap(os.path.join(self.path, VECTORS_FILE), dtype=np.float32, mode='r+',
+                                 shape=(shape[0], self.dim)) if capacity else np.zeros((0, self.dim), np.float32)
+        self.assign = np.memmap(os.path.join(self.path, ASSIGN_FILE), dtype=np.int32, mode='r+',
+                                shape=shape) if capacity else np.zeros(0, np.int32)
+        self.alive = np.memmap(os.path.join(self.path, ALIVE_FILE), dtype=np.uint8, mode='r+',
+                               shape=shape) if capacity else np.zeros(0, np.uint8)
+
+    def _grow(self, capacity):
+        # Extend the backing files in place, then re-map them at the new size
+        for array in (self.vectors, self.assign, self.alive):
+            if isinstance(array, np.memmap):
+                array.flush()
+        self.vectors = self.assign = self.alive = None
+        for name, itemsize in ((VECTORS_FILE, 4 * self.dim), (ASSIGN_FILE, 4), (ALIVE_FILE, 1)):
+            with open(os.path.join(self.path, name), 'r+b') as f:
+                f.truncate(capacity * itemsize)
+        self.meta['capacity'] = capacity
+        self._map_files(capacity)
+
+    @staticmethod
+    def _write_meta(path, meta):
+        tmp = os.path.join(path, META_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, META_FILE))
+
+
+def build_resume_index(source, path, embedder, nlist=None, store_path=None):
+    """Index every resume in FLATTENED_RESUME_PDFS by RESUME_ID, reusing vectors from an embedding store if given"""
+    resumes = source.sql(f"SELECT * FROM {RESUME_TABLE}")
+    vectors = entity_vectors(resumes, 'VECTOR_EMBEDDING_VARIANT', RESUME_EMBEDDING_FIELDS, embedder,
+                             'RESUME_ID', store_path)
+    return IVFIndex.create(path, resumes['RESUME_ID'].astype(str).tolist(), vectors, nlist=nlist)
+
+
+def top_resumes_for_req(index, req, embedder, k=10, nprobe=8):
+    """Top-k RESUME_IDs across all categories for one JOBREQ_FLATTENED row (dict or Series)"""
+    frame = pd.DataFrame([dict(req)])
+    vector = embedder.embed(entity_texts(frame, 'VECTOR_EMBEDDING_VARIANT_JOBREQ', JOBREQ_EMBEDDING_FIELDS))[0]
+    return index.search(vector, k=k, nprobe=nprobe)
@@ -0,0 +1,234 @@
+"""Headless batch ranking: per-req top-k shortlists scored across a process pool, resumable from checkpoints"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from data_sources import DATA_DIR_ENV, JOBREQ_TABLE, RESUME_TABLE, LocalSource
+from embedding_store import embedder_key
+from scoring import HashingEmbedder, score_gold
+
+DEFAULT_TOP_K = 50
+DEFAULT_OUTPUT_DIR = 'shortlists'
+# Resumes scored per worker task; a req's resumes are never split across tasks
+DEFAULT_CHUNK_RESUMES = 20000
+
+PARTS_DIR = 'parts'
+# Age after which a part-*.tmp file is taken to be left over from a crashed worker
+STALE_PART_SECONDS = 3600
+SHORTLIST_FILE = 'shortlists'
+SUMMARY_FILE = 'summary.json'
+
+SHORTLIST_COLUMNS = ['REQ_ID', 'JOB_TITLE', 'CATEGORY', 'RANK_WITHIN_REQ', 'RESUME_ID', 'MATCH_SCORE',
+                     'RESUME_CURRENT_JOB', 'RESUME_YOE', 'REQ_YOE', 'RESUME_TECH_SKILLS', 'FILE_PATH']
+
+
+def read_frame(path):
+    """A Parquet file or directory, or a CSV file"""
+    if str(path).lower().endswith('.csv'):
+        return pd.read_csv(path)
+    return pd.read_parquet(path)
+
+
+def load_inputs(data_dir=None, resumes_path=None, reqs_path=None):
+    """(FLATTENED_RESUME_PDFS, JOBREQ_FLATTENED) frames from files where given, else from the local replica"""
+    source = None
+    if resumes_path is None or reqs_path is None:
+        data_dir = data_dir or os.environ.get(DATA_DIR_ENV)
+        if not data_dir:
+            raise ValueError(f"Pass --data-dir (or set {DATA_DIR_ENV}) or both --resumes and --reqs")
+        source = LocalSource(data_dir)
+    resumes = read_frame(resumes_path) if resumes_path else source.sql(f"SELECT * FROM {RESUME_TABLE}")
+    reqs = read_frame(reqs_path) if reqs_path else source.sql(f"SELECT * FROM {JOBREQ_TABLE}")
+    return resumes, reqs
+
+
+def _version(frame, rows):
+    # Latest extraction of a chunk's rows, so re-extracted inputs change the chunk key; plain files
+    # without (complete) EXTRACTION_TIMESTAMPs are keyed on the content of every column instead
+    if not len(rows):
+        return None
+    chunk = frame.iloc[rows]
+    if 'EXTRACTION_TIMESTAMP' in chunk.columns and chunk['EXTRACTION_TIMESTAMP'].notna().all():
+        return str(chunk['EXTRACTION_TIMESTAMP'].max())
+    content = chunk.to_json(orient='values', date_format='iso', default_handler=str)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def plan_chunks(resumes, reqs, chunk_resumes=DEFAULT_CHUNK_RESUMES):
+    """[(key, req rows, resume rows)]: whole reqs grouped until a chunk holds about chunk_resumes resumes
+
+    The key identifies the chunk's inputs, so a finished chunk is skipped on a resumed run.
+    """
+    resume_blocks = pd.Series(np.arange(len(resumes))).groupby(resumes['CATEGORY'].astype(str).to_numpy()).indices
+    req_blocks = pd.Series(np.arange(len(reqs))).groupby(reqs['REQ_ID'].astype(str).to_numpy()).indices
+    empty = np.array([], dtype=np.int64)
+
+    chunks, req_ids, size = [], [], 0
+    for req_id in sorted(req_blocks):
+        req_ids.append(req_id)
+        size += len(resume_blocks.get(req_id, empty))
+        if size >= chunk_resumes:
+            chunks.append(req_ids)
+            req_ids, size = [], 0
+    if req_ids:
+        chunks.append(req_ids)
+
+    planned = []
+    for chunk in chunks:
+        req_rows = np.concatenate([req_blocks[req_id] for req_id in chunk])
+        resume_rows = np.concatenate([resume_blocks.get(req_id, empty) for req_id in chunk])
+        digest = hashlib.blake2b(digest_size=8)
+        for part in (chunk, resumes['RESUME_ID'].astype(str).to_numpy()[resume_rows].tolist(),
+                     [_version(resumes, resume_rows), _version(reqs, req_rows)]):
+            digest.update(json.dumps(part, default=str).encode('utf-8'))
+        planned.append((digest.hexdigest(), req_rows, resume_rows))
+    return planned
+
+
+def _rank_chunk(resumes, reqs, top_k, embedder, path):
+    """Worker task: score one chunk and write its shortlist part; returns (path, rows, pairs, seconds, pid)"""
+    started = time.perf_counter()
+    gold = score_gold(resumes, reqs, embedder, top_k)
+    shortlist = gold.reindex(columns=SHORTLIST_COLUMNS)
+    # Written under a temporary name and renamed, so a part on disk is always complete
+    shortlist.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+    # Every req is scored against each resume filed under it
+    per_req = resumes['CATEGORY'].astype(str).value_counts()
+    pairs = int(reqs['REQ_ID'].astype(str).map(per_req).fillna(0).sum())
+    return path, len(shortlist), pairs, time.perf_counter() - started, os.getpid()
+
+
+def rank_batch(resumes, reqs, output_dir=DEFAULT_OUTPUT_DIR, top_k=DEFAULT_TOP_K, workers=None,
+               chunk_resumes=DEFAULT_CHUNK_RESUMES, embedder=None, fresh=False, parts_dir=None):
+    """Write top_k shortlists for every req to output_dir (Parquet and CSV) and return the run summary
+
+    Each chunk's shortlist is checkpointed under parts_dir (default output_dir/parts)
+    as it finishes; an interrupted run picks up where it stopped. Parts are named
+    by their inputs, so runs over different req sets can share one parts_dir;
+    fresh deletes only this run's parts, so they are scored again. The embedder is pickled into every
+    worker, so it must not hold a connection.
+    """
+    embedder = embedder or HashingEmbedder()
+    workers = workers or os.cpu_count() or 1
+    timings = {}
+    started = time.perf_counter()
+
+    stage = time.perf_counter()
+    resumes = resumes.reset_index(drop=True)
+    reqs = reqs.reset_index(drop=True)
+    chunks = plan_chunks(resumes, reqs, chunk_resumes)
+    parts_dir = parts_dir or os.path.join(output_dir, PARTS_DIR)
+    os.makedirs(parts_dir, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+    # The part name covers the chunk's inputs and the scoring settings
+    settings = hashlib.blake2b(f'{top_k}|{embedder_key(embedder)}'.encode('utf-8'), digest_size=4).hexdigest()
+    paths = [os.path.join(parts_dir, f'part-{key}-{settings}.parquet') for key, _, _ in chunks]
+    if fresh:
+        # Only this run's parts: other req sets' checkpoints in a shared parts_dir are kept
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+    # Temporary parts left by an interrupted worker are never read; older ones are swept on every run
+    # (a concurrent run's part is written and renamed in well under STALE_PART_SECONDS)
+    for name in os.listdir(parts_dir):
+        path = os.path.join(parts_dir, name)
+        stale = time.time() - os.path.getmtime(path) > STALE_PART_SECONDS
+        if name.startswith('part-') and name.endswith('.tmp') and stale:
+            os.remove(path)
+    pending = [(chunk, path) for chunk, path in zip(chunks, paths) if not os.path.exists(path)]
+    timings['plan'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    busy, pairs = {}, 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = [pool.submit(_rank_chunk, resumes.iloc[resume_rows], reqs.iloc[req_rows], top_k, embedder, path)
+                       for (_, req_rows, resume_rows), path in pending]
+            for future in as_completed(futures):
+                _, _, part_pairs, seconds, pid = future.result()
+                pairs += part_pairs
+                busy[pid] = busy.get(pid, 0.0) + seconds
+    score_seconds = time.perf_counter() - stage
+    timings['score'] = score_seconds
+
+    stage = time.perf_counter()
+    shortlist = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True) if paths else \
+        pd.DataFrame(columns=SHORTLIST_COLUMNS)
+    shortlist = shortlist.sort_values(['REQ_ID', 'RANK_WITHIN_REQ'], kind='stable').reset_index(drop=True)
+    timings['merge'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    for suffix, write in (('.parquet', shortlist.to_parquet), ('.csv', shortlist.to_csv)):
+        path = os.path.join(output_dir, SHORTLIST_FILE + suffix)
+        write(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+    timings['write'] = time.perf_counter() - stage
+
+    wall = time.perf_counter() - started
+    pool_workers = min(workers, len(pending)) if pending else 0
+    return {
+        'reqs': int(reqs['REQ_ID'].nunique()),
+        'resumes': len(resumes),
+        'top_k': top_k,
+        'chunks': len(chunks),
+        'chunks_scored': len(pending),
+        'chunks_resumed': len(chunks) - len(pending),
+        'pairs_scored': pairs,
+        'shortlist_rows': len(shortlist),
+        'workers': pool_workers,
+        'stage_seconds': timings,
+        'wall_seconds': wall,
+        'pairs_per_second': pairs / score_seconds if score_seconds and pairs else 0.0,
+        # Share of the pool's available time spent inside scoring
+        'worker_utilization': sum(busy.values()) / (score_seconds * pool_workers) if pool_workers else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank every req's resumes and write top-k shortlists")
+    parser.add_argument('--data-dir', help=f"local replica to read from (default: ${DATA_DIR_ENV})")
+    parser.add_argument('--resumes', help="FLATTENED_RESUME_PDFS rows as Parquet or CSV, instead of the replica")
+    parser.add_argument('--reqs', help="JOBREQ_FLATTENED rows as Parquet or CSV, instead of the replica")
+    parser.add_argument('--req', action='append',
+                        help="rank only this REQ_ID (repeatable); output goes to a reqs-<hash> subdirectory")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-resumes', type=int, default=DEFAULT_CHUNK_RESUMES)
+    parser.add_argument('--fresh', action='store_true', help="discard checkpointed parts from an earlier run")
+    args = parser.parse_args(argv)
+
+    stage = time.perf_counter()
+    resumes, reqs = load_inputs(args.data_dir, args.resumes, args.reqs)
+    if args.req:
+        reqs = reqs[reqs['REQ_ID'].astype(str).isin(args.req)]
+    load_seconds = time.perf_counter() - stage
+
+    # A subset run keeps its shortlists apart from the full run's, but shares its checkpoints
+    output_dir = args.output_dir
+    if args.req:
+        subset = hashlib.blake2b(json.dumps(sorted(set(args.req))).encode('utf-8'), digest_size=4).hexdigest()
+        output_dir = os.path.join(args.output_dir, f'reqs-{subset}')
+    summary = rank_batch(resumes, reqs, output_dir, args.top_k, args.workers, args.chunk_resumes,
+                         fresh=args.fresh, parts_dir=os.path.join(args.output_dir, PARTS_DIR))
+    summary['stage_seconds'] = {'load': load_seconds, **summary['stage_seconds']}
+    summary['wall_seconds'] += load_seconds
+    with open(os.path.join(output_dir, SUMMARY_FILE), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"{summary['shortlist_rows']} shortlist rows for {summary['reqs']} reqs in {summary['wall_seconds']:.1f}s "
+          f"({summary['chunks_scored']} chunks scored, {summary['chunks_resumed']} resumed, "
+          f"{summary['pairs_per_second']:,.0f} pairs/s across {summary['workers']} workers) into {output_dir}")
+    for name, seconds in summary['stage_seconds'].items():
+        print(f"  {name:6s} {seconds:8.2f}s")
+
+
+if __name__ == '__main__':
+    main()
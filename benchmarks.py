@@ -0,0 +1,275 @@
+"""Seeded synthetic-scale benchmarks for the matcher and the gold pipeline, with baseline regression checks"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_sources import GOLD_TABLE, JOBREQ_TABLE, JOBS_DIM_TABLE, RESUME_TABLE, TABLE_SCHEMAS, LocalSource
+from gold_snapshot import GoldSnapshotCache
+from instrumentation import Tracer
+from jobs_dimension import build_jobs_dimension
+from scoring import HashingEmbedder, score_gold
+
+DEFAULT_BASELINE = 'benchmarks_baseline.json'
+DEFAULT_TOLERANCE = 0.25
+# Sub-millisecond benchmarks jitter by more than any tolerance; smaller slowdowns are ignored
+MIN_REGRESSION_MS = 1.0
+
+DEPARTMENTS = ['IT', 'HR', 'MECHANICALCHEMICALQUALITYENGINEERING', 'BANKING', 'SALES', 'FINANCE', 'HEALTHCARE']
+TITLES = ['Software Engineer', 'Data Analyst', 'HR Generalist', 'Process Engineer', 'Quality Engineer',
+          'Account Executive', 'Financial Analyst', 'Systems Administrator', 'Chemical Engineer', 'Nurse']
+SKILLS = ['Python', 'SQL', 'Java', 'Excel', 'Tableau', 'AWS', 'Six Sigma', 'AutoCAD', 'MATLAB', 'SAP',
+          'Salesforce', 'Payroll', 'Recruiting', 'Docker', 'Kubernetes', 'Lean', 'HPLC', 'GMP', 'R', 'Spark']
+
+
+def _skill_lists(rng, count, low, high):
+    sizes = rng.integers(low, high + 1, size=count)
+    picks = rng.integers(0, len(SKILLS), size=(count, high))
+    return [[SKILLS[i] for i in dict.fromkeys(row[:size])] for row, size in zip(picks, sizes)]
+
+
+def _table_frame(table, columns):
+    """Frame with every column of a replica table, filling the ones not generated with NULLs"""
+    return pd.DataFrame(columns).reindex(columns=[column for column, _ in TABLE_SCHEMAS[table]])
+
+
+def generate_reqs(rng, count):
+    """JOBREQ_FLATTENED rows"""
+    req_ids = np.char.add('REQ', np.char.zfill(np.arange(count).astype(str), 6))
+    titles = np.array(TITLES)[rng.integers(0, len(TITLES), size=count)]
+    return _table_frame(JOBREQ_TABLE, {
+        'EXTRACTION_TIMESTAMP': pd.Timestamp('2025-01-01', tz='UTC'),
+        'REQ_ID': req_ids,
+        'CATEGORY': np.array(DEPARTMENTS)[rng.integers(0, len(DEPARTMENTS), size=count)],
+        'JOB_TITLE': titles,
+        'YEARS_OF_EXPERIENCE_REQUIRED': rng.integers(0, 15, size=count),
+        'TECHNICAL_SKILLS_REQUIRED': [json.dumps(skills) for skills in _skill_lists(rng, count, 2, 6)],
+        'REQUIRES_BACHELORS': rng.random(count) < 0.7,
+    })
+
+
+def generate_resumes(rng, count, req_ids):
+    """FLATTENED_RESUME_PDFS rows; CATEGORY is the REQ_ID the resume was submitted to"""
+    categories = np.asarray(req_ids)[rng.integers(0, len(req_ids), size=count)]
+    resume_ids = np.char.add(np.arange(count).astype(str), '.pdf')
+    return _table_frame(RESUME_TABLE, {
+        'FILE_PATH': np.char.add(np.char.add(categories.astype(str), '/'), resume_ids),
+        'RESUME_ID': resume_ids,
+        'EXTRACTION_TIMESTAMP': pd.Timestamp('2025-01-01', tz='UTC'),
+        'CATEGORY': categories,
+        'MOST_RECENT_JOB_TITLE': np.array(TITLES)[rng.integers(0, len(TITLES), size=count)],
+        'YEARS_OF_EXPERIENCE': rng.integers(0, 30, size=count),
+        'TECHNICAL_SKILLS': [', '.join(skills) for skills in _skill_lists(rng, count, 1, 8)],
+        'HAS_BACHELORS': rng.random(count) < 0.6,
+        'HAS_MASTERS': rng.random(count) < 0.2,
+    })
+
+
+def generate_gold(rng, reqs, resumes, candidates):
+    """GOLD_TABLE_COMPARISONS rows: `candidates` ranked resumes per req"""
+    req_rows = np.repeat(np.arange(len(reqs)), candidates)
+    resume_rows = rng.integers(0, len(resumes), size=len(req_rows))
+    # Scores descend within each req so rank 1 has the best match
+    scores = np.sort(rng.random((len(reqs), candidates)), axis=1)[:, ::-1].ravel()
+    ranks = np.tile(np.arange(1, candidates + 1), len(reqs))
+    req = reqs.iloc[req_rows].reset_index(drop=True)
+    resume = resumes.iloc[resume_rows].reset_index(drop=True)
+    return _table_frame(GOLD_TABLE, {
+        'REQ_ID': req['REQ_ID'],
+        'JOB_TITLE': req['JOB_TITLE'],
+        'RESUME_ID': resume['RESUME_ID'],
+        'RESUME_TECH_SKILLS': resume['TECHNICAL_SKILLS'],
+        'RESUME_YOE': resume['YEARS_OF_EXPERIENCE'],
+        'REQ_TECH_SKILLS': req['TECHNICAL_SKILLS_REQUIRED'],
+        'REQ_YOE': req['YEARS_OF_EXPERIENCE_REQUIRED'],
+        'RESUME_CURRENT_JOB': resume['MOST_RECENT_JOB_TITLE'],
+        'RESUME_JOB_TITLE': req['JOB_TITLE'],
+        'MATCH_SCORE': scores,
+        'FILE_PATH': resume['FILE_PATH'],
+        'CATEGORY': req['CATEGORY'],
+        'RANK_WITHIN_REQ': ranks,
+    })
+
+
+def generate_tables(data_dir, reqs=1000, resumes=10000, candidates=100, seed=0):
+    """Write seeded gold, jobs dimension, job and resume tables into a local replica and return its source"""
+    rng = np.random.default_rng(seed)
+    req_df = generate_reqs(rng, reqs)
+    resume_df = generate_resumes(rng, resumes, req_df['REQ_ID'])
+    gold_df = generate_gold(rng, req_df, resume_df, candidates)
+    source = LocalSource(data_dir)
+    source.write_table(JOBREQ_TABLE, req_df)
+    source.write_table(RESUME_TABLE, resume_df)
+    source.write_table(GOLD_TABLE, gold_df)
+    source.write_table(JOBS_DIM_TABLE, build_jobs_dimension(gold_df))
+    return source
+
+
+def measure(fn, repeat=5, warmup=1, items=None):
+    """Wall-clock stats for fn over `repeat` runs; items per run turns the median into a throughput"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings = np.array(timings)
+    result = {
+        'runs': repeat,
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'min_ms': float(timings.min()),
+    }
+    if items:
+        result['items'] = items
+        result['items_per_second'] = items / (result['p50_ms'] / 1000) if result['p50_ms'] else None
+    return result
+
+
+def run_benchmarks(source, repeat=5, seed=0, scoring_resumes=20000, page_size=20):
+    """Every benchmark against one replica; returns {name: stats}"""
+    # The app module is only needed here; importing it has no UI side effects
+    from streamlit_app import SimpleResumeMatcher, render_candidate_cards
+
+    rng = np.random.default_rng(seed + 1)
+    results = {}
+
+    results['snapshot_load'] = measure(lambda: GoldSnapshotCache(source, poll_interval=0).get(), repeat)
+
+    # Snapshot-backed matcher (the normal app path) and a query-per-call matcher (no snapshot)
+    matcher = SimpleResumeMatcher(source=source, tracer=Tracer(max_events=100))
+    matcher.snapshots = GoldSnapshotCache(matcher.source, poll_interval=0)
+    snapshot = matcher.get_snapshot()
+    direct = SimpleResumeMatcher(source=source, tracer=Tracer(max_events=100))
+    direct.snapshots = None
+
+    results['job_list_query'] = measure(lambda: direct.get_jobs('All'), repeat)
+    results['job_list_snapshot'] = measure(lambda: (matcher.get_categories(), matcher.get_jobs('All')), repeat)
+
+    categories = matcher.get_categories()
+    results['category_filter'] = measure(lambda: [matcher.get_jobs(category) for category in categories], repeat,
+                                         items=len(categories))
+    results['job_search'] = measure(lambda: matcher.get_jobs('All', 'engineer python'), repeat)
+
+    req_ids = list(snapshot.req_ranges)
+    sample = [req_ids[i] for i in rng.integers(0, len(req_ids), size=min(100, len(req_ids)))]
+    results['candidate_page_snapshot'] = measure(
+        lambda: [matcher.get_candidates_page(req_id, 0, page_size) for req_id in sample], repeat, items=len(sample))
+    sql_sample = sample[:20]
+    results['candidate_page_query'] = measure(
+        lambda: [direct.get_candidates_page(req_id, 0, page_size) for req_id in sql_sample], repeat,
+        items=len(sql_sample))
+    deepest = max(stop - start for start, stop in snapshot.req_ranges.values())
+    results['candidate_deep_page_query'] = measure(
+        lambda: [direct.get_candidates_page(req_id, max(deepest - page_size, 0), page_size) for req_id in sql_sample],
+        repeat, items=len(sql_sample))
+
+    page, _ = matcher.get_candidates_page(sample[0], 0, page_size)
+    results['card_render_page'] = measure(lambda: render_candidate_cards(page), repeat, items=len(page))
+    full = snapshot.candidates(sample[0])
+    results['card_render_req'] = measure(lambda: render_candidate_cards(full), repeat, items=len(full))
+
+    # Skill filters over every candidate row of the snapshot, not just one req
+    if snapshot.skills is not None:
+        skill_rows = snapshot.skills.lookup(snapshot.candidates_df['FILE_PATH'].tolist())
+        results['skill_filter'] = measure(lambda: snapshot.skills.match(skill_rows, ['Python'], ['SQL', 'AWS']),
+                                          repeat, items=len(skill_rows))
+
+    # Slider-driven re-ranking of the largest req with every factor switched on (--candidates sets its size)
+    deepest_req = next(req_id for req_id, (start, stop) in snapshot.req_ranges.items() if stop - start == deepest)
+    weights = {'match': 0.4, 'experience': 0.2, 'degree': 0.2, 'skills': 0.2}
+    results['rerank_req'] = measure(lambda: snapshot.ranked_candidates(deepest_req, weights, limit=page_size),
+                                    repeat, items=deepest)
+    results['rerank_req_skills'] = measure(
+        lambda: snapshot.ranked_candidates(deepest_req, weights, ['Python'], ['SQL'], limit=page_size),
+        repeat, items=deepest)
+
+    resumes = source.sql(f"SELECT * FROM {RESUME_TABLE} LIMIT {int(scoring_resumes)}")
+    reqs = source.sql(f"SELECT * FROM {JOBREQ_TABLE}")
+    embedder = HashingEmbedder()
+    results['scoring'] = measure(lambda: score_gold(resumes, reqs, embedder), max(1, repeat // 2), warmup=0,
+                                 items=len(resumes))
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, min_delta_ms=MIN_REGRESSION_MS):
+    """Benchmarks whose median got slower than the baseline by more than tolerance (and min_delta_ms)"""
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        limit = reference['p50_ms'] * (1 + tolerance)
+        if stats['p50_ms'] > limit and stats['p50_ms'] - reference['p50_ms'] > min_delta_ms:
+            regressions.append({'name': name, 'p50_ms': stats['p50_ms'], 'baseline_p50_ms': reference['p50_ms'],
+                                'ratio': stats['p50_ms'] / reference['p50_ms']})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic-scale benchmarks against a local replica")
+    parser.add_argument('--reqs', type=int, default=1000)
+    parser.add_argument('--resumes', type=int, default=10000)
+    parser.add_argument('--candidates', type=int, default=100, help="ranked candidates per req in the gold table")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scoring-resumes', type=int, default=20000)
+    parser.add_argument('--data-dir', help="replica directory for the generated tables (default: a temp dir)")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    config = {'reqs': args.reqs, 'resumes': args.resumes, 'candidates': args.candidates, 'seed': args.seed,
+              'scoring_resumes': args.scoring_resumes}
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='resume_matcher_bench_')
+    started = time.perf_counter()
+    source = generate_tables(data_dir, args.reqs, args.resumes, args.candidates, args.seed)
+    print(f"Generated {args.reqs} reqs, {args.resumes} resumes, {args.reqs * args.candidates} gold rows "
+          f"in {time.perf_counter() - started:.1f}s ({data_dir})")
+
+    results = run_benchmarks(source, args.repeat, args.seed, args.scoring_resumes)
+    report = {
+        'config': config,
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'pandas': pd.__version__, 'numpy': np.__version__},
+        'created_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in results.items():
+        throughput = f"  {stats['items_per_second']:,.0f}/s" if stats.get('items_per_second') else ''
+        print(f"{name:28s} p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms{throughput}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print(f"Baseline was recorded with {baseline.get('config')}; not comparing against {config}")
+        return 0
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression['name']}: {regression['p50_ms']:.2f} ms vs "
+              f"{regression['baseline_p50_ms']:.2f} ms baseline ({regression['ratio']:.2f}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
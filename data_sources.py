@@ -0,0 +1,420 @@
+"""Pluggable data sources for the matcher: Snowpark or a local DuckDB/Parquet replica"""
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+GOLD_TABLE = "HACKATHON_2025.JOE.GOLD_TABLE_COMPARISONS"
+JOBREQ_TABLE = "HACKATHON_2025.JOE.JOBREQ_FLATTENED"
+RESUME_TABLE = "HACKATHON_2025.JOE.FLATTENED_RESUME_PDFS"
+JOBS_DIM_TABLE = "HACKATHON_2025.JOE.JOBS_DIM"
+DEPARTMENTS_TABLE = "HACKATHON_2025.JOE.DEPARTMENTS"
+SILVER_JOBS_TABLE = "HACKATHON_2025.JOBREQS.SILVER_JOB_LISTINGS_FLATTENED"
+BRONZE_JOBS_TABLE = "HACKATHON_2025.JOBREQS.BRONZE_JOB_LISTINGS"
+
+# Set to a directory of exported Parquet files to run the app against the local replica
+DATA_DIR_ENV = "RESUME_MATCHER_DATA_DIR"
+
+# Column layouts from "01 - SQL Setup.sql"; VARIANT/OBJECT columns are carried as JSON text,
+# which is also what Snowpark's to_pandas() returns for them
+TABLE_SCHEMAS = {
+    GOLD_TABLE: [
+        ('REQ_ID', 'VARCHAR'),
+        ('JOB_TITLE', 'VARCHAR'),
+        ('RESUME_ID', 'VARCHAR'),
+        ('RESUME_TECH_SKILLS', 'VARCHAR'),
+        ('RESUME_YOE', 'NUMBER'),
+        ('REQ_TECH_SKILLS', 'VARCHAR'),
+        ('REQ_YOE', 'NUMBER'),
+        ('RESUME_CURRENT_JOB', 'VARCHAR'),
+        ('RESUME_JOB_TITLE', 'VARCHAR'),
+        ('MATCH_SCORE', 'FLOAT'),
+        ('FILE_PATH', 'VARCHAR'),
+        ('FILE_URL', 'VARCHAR'),
+        ('CATEGORY', 'VARCHAR'),
+        ('COMMUNITY_VOLUNTEER_BOOL', 'BOOLEAN'),
+        ('COMMUNITY_VOLUNTEER', 'VARCHAR'),
+        ('COLLEGE_SPORTS', 'VARCHAR'),
+        ('COLLEGE_SPORTS_DIVISION', 'VARCHAR'),
+        ('INTERESTING', 'VARCHAR'),
+        ('PERSONAL_INTERESTS', 'VARCHAR'),
+        ('SPOKEN_LANGUAGES', 'VARCHAR'),
+        ('RANK_WITHIN_REQ', 'NUMBER'),
+        ('FIRSTNAME_LASTNAME', 'VARCHAR'),
+    ],
+    JOBS_DIM_TABLE: [
+        ('REQ_ID', 'VARCHAR'),
+        ('JOB_TITLE', 'VARCHAR'),
+        ('CATEGORY', 'VARCHAR'),
+        ('DEPARTMENT', 'VARCHAR'),
+        ('REQ_TECH_SKILLS', 'VARCHAR'),
+        ('SKILLS', 'VARIANT'),
+        ('CANDIDATE_COUNT', 'NUMBER'),
+    ],
+    DEPARTMENTS_TABLE: [
+        ('CATEGORY', 'VARCHAR'),
+        ('DEPARTMENT', 'VARCHAR'),
+    ],
+    JOBREQ_TABLE: [
+        ('EXTRACTION_TIMESTAMP', 'TIMESTAMP_LTZ'),
+        ('REQ_ID', 'VARCHAR'),
+        ('CATEGORY', 'VARCHAR'),
+        ('JOB_TITLE', 'VARCHAR'),
+        ('YEARS_OF_EXPERIENCE_REQUIRED', 'NUMBER'),
+        ('TECHNICAL_SKILLS_REQUIRED', 'VARCHAR'),
+        ('ADDITIONAL_SKILLS_REQUIRED', 'VARCHAR'),
+        ('CERTIFICATIONS_REQUIRED', 'VARCHAR'),
+        ('JOB_TITLES_LIST', 'VARCHAR'),
+        ('REQUIRES_NON_ENGLISH_LANGUAGES', 'BOOLEAN'),
+        ('SPOKEN_LANGUAGES_REQUIRED', 'VARCHAR'),
+        ('PROGRAMMING_LANGUAGES_REQUIRED', 'VARCHAR'),
+        ('REQUIRES_LEADERSHIP_EXPERIENCE', 'BOOLEAN'),
+        ('LEADERSHIP_EXPERIENCE_DETAILS', 'VARCHAR'),
+        ('REQUIRES_DOCTORATE', 'BOOLEAN'),
+        ('REQUIRES_MASTERS', 'BOOLEAN'),
+        ('REQUIRES_BACHELORS', 'BOOLEAN'),
+        ('REQUIRES_HIGH_SCHOOL_DIPLOMA', 'BOOLEAN'),
+        ('REQUIRED_DOCTORATE_FIELD', 'VARCHAR'),
+        ('REQUIRED_MASTERS_FIELD', 'VARCHAR'),
+        ('REQUIRED_BACHELORS_FIELD', 'VARCHAR'),
+        ('FULL_EXTRACTED_JSON', 'OBJECT'),
+        ('VECTOR_EMBEDDING_VARIANT_JOBREQ', 'VARIANT'),
+    ],
+    RESUME_TABLE: [
+        ('FILE_PATH', 'VARCHAR'),
+        ('RESUME_ID', 'VARCHAR'),
+        ('FILE_URL', 'VARCHAR'),
+        ('EXTRACTION_TIMESTAMP', 'TIMESTAMP_LTZ'),
+        ('CATEGORY', 'VARCHAR'),
+        ('MOST_RECENT_JOB_TITLE', 'VARCHAR'),
+        ('YEARS_OF_EXPERIENCE', 'NUMBER'),
+        ('TECHNICAL_SKILLS', 'VARCHAR'),
+        ('ADDITIONAL_SKILLS', 'VARCHAR'),
+        ('CERTIFICATIONS', 'VARCHAR'),
+        ('JOB_TITLES_LIST', 'VARCHAR'),
+        ('COMMUNITY_VOLUNTEER_BOOL', 'BOOLEAN'),
+        ('COMMUNITY_VOLUNTEER', 'VARCHAR'),
+        ('SPOKEN_LANGUAGES_BOOL', 'BOOLEAN'),
+        ('SPOKEN_LANGUAGES', 'VARCHAR'),
+        ('PROGRAMMING_LANGUAGES', 'VARCHAR'),
+        ('COLLEGE_SPORTS', 'VARCHAR'),
+        ('COLLEGE_SPORTS_DIVISION', 'VARCHAR'),
+        ('PERSONAL_INTERESTS', 'VARCHAR'),
+        ('INTERESTING', 'VARCHAR'),
+        ('LEADERSHIP_EXPERIENCE_BOOL', 'BOOLEAN'),
+        ('LEADERSHIP_EXPERIENCE', 'VARCHAR'),
+        ('HAS_DOCTORATE', 'BOOLEAN'),
+        ('HAS_MASTERS', 'BOOLEAN'),
+        ('HAS_BACHELORS', 'BOOLEAN'),
+        ('HAS_HIGH_SCHOOL_DIPLOMA', 'BOOLEAN'),
+        ('DOCTORATE_NAME', 'VARCHAR'),
+        ('MASTERS_NAME', 'VARCHAR'),
+        ('BACHELORS_NAME', 'VARCHAR'),
+        ('FULL_EXTRACTED_JSON', 'OBJECT'),
+        ('VECTOR_EMBEDDING_VARIANT', 'VARIANT'),
+    ],
+    SILVER_JOBS_TABLE: [
+        ('CLASSIFED', 'VARIANT'),
+        ('CATEGORY', 'VARCHAR'),
+        ('REQ_ID', 'VARCHAR'),
+        ('JOB_ID', 'VARCHAR'),
+        ('JOB_TITLE', 'VARCHAR'),
+        ('ORGANIZATION_NAME', 'VARCHAR'),
+        ('ORGANIZATION_URL', 'VARCHAR'),
+        ('DATE_POSTED', 'TIMESTAMP_NTZ'),
+        ('DATE_CREATED', 'TIMESTAMP_NTZ'),
+        ('DATE_VALID_THROUGH', 'TIMESTAMP_NTZ'),
+        ('JOB_DESCRIPTION', 'VARCHAR'),
+    ],
+    BRONZE_JOBS_TABLE: [
+        ('FILENAME', 'VARCHAR'),
+        ('FILE_ROW_NUMBER', 'NUMBER'),
+        ('INGESTION_TIMESTAMP', 'TIMESTAMP_LTZ'),
+        ('RAW_JSON', 'VARIANT'),
+    ],
+}
+
+# Bind-parameter IN lists are split into chunks of this many values
+IN_LIST_SIZE = 256
+
+# Snowflake column types -> DuckDB column types
+DUCKDB_TYPES = {
+    'VARCHAR': 'VARCHAR',
+    'NUMBER': 'BIGINT',
+    'FLOAT': 'DOUBLE',
+    'BOOLEAN': 'BOOLEAN',
+    'VARIANT': 'VARCHAR',
+    'OBJECT': 'VARCHAR',
+    'TIMESTAMP_LTZ': 'TIMESTAMPTZ',
+    'TIMESTAMP_NTZ': 'TIMESTAMP',
+}
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def fetch_where_in(source, table, column, values, columns='*'):
+    """Rows of a table whose column is in values, using bind parameters in fixed-size chunks"""
+    values = list(dict.fromkeys(values))
+    frames = []
+    for chunk in chunked(values, IN_LIST_SIZE):
+        placeholders = ', '.join(['?'] * len(chunk))
+        frames.append(source.sql(f"SELECT {columns} FROM {table} WHERE {column} IN ({placeholders})", params=chunk))
+    if not frames:
+        return source.sql(f"SELECT {columns} FROM {table} WHERE 1 = 0")
+    return pd.concat(frames, ignore_index=True)
+
+
+def table_file_name(table):
+    """Parquet file (or directory of part files) that backs a table in the local replica"""
+    return table.split('.')[-1] + '.parquet'
+
+
+class SnowparkSource:
+    """Runs queries on a Snowpark session"""
+
+    name = 'snowflake'
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def key(self):
+        """Hashable identity of the data behind this source (its Snowflake session)"""
+        return (self.name, getattr(self.session, 'session_id', None) or id(self.session))
+
+    def sql(self, query, params=None):
+        return self.session.sql(query, params=params).to_pandas()
+
+    def table_version(self, table):
+        """(commit version, last altered) for a fully qualified table"""
+        database, schema, name = table.split('.')
+        row = self.sql(f"""
+        SELECT
+            SYSTEM$LAST_CHANGE_COMMIT_TIME('{table}') AS VERSION,
+            LAST_ALTERED
+        FROM {database}.INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?
+        """, params=[schema, name])
+        if row.empty:
+            return None
+        return (str(row['VERSION'].iloc[0]), str(row['LAST_ALTERED'].iloc[0]))
+
+    def write_table(self, table, frame, variant_columns=()):
+        """Replace the contents of a table with a DataFrame
+
+        An existing table keeps its column types (JSON text in variant_columns is
+        loaded with PARSE_JSON); a missing one is created from the frame's dtypes.
+        """
+        database, schema, name = table.split('.')
+        if not self._table_exists(table):
+            self.session.write_pandas(frame, name, database=database, schema=schema,
+                                      auto_create_table=True, overwrite=True)
+            return
+        staging = self._stage(table, frame, 'REPLACE')
+        self.session.sql("BEGIN").collect()
+        try:
+            self.session.sql(f"DELETE FROM {table}").collect()
+            self._insert_staged(table, staging, frame.columns, variant_columns)
+            self.session.sql("COMMIT").collect()
+        except Exception:
+            self.session.sql("ROLLBACK").collect()
+            raise
+
+    def replace_rows(self, table, key_column, keys, frame, variant_columns=()):
+        """Delete the rows whose key_column is in keys and append frame, in one transaction
+
+        write_pandas runs DDL (temporary stage and file format), which would commit an
+        open transaction, so the frame is staged into a temporary table first and only
+        DML runs between BEGIN and COMMIT. JSON text in variant_columns is loaded
+        with PARSE_JSON.
+        """
+        keys = list(keys)
+        staging = self._stage(table, frame, 'REPLACE') if len(frame) else None
+        self.session.sql("BEGIN").collect()
+        try:
+            for chunk in chunked(keys, IN_LIST_SIZE):
+                placeholders = ', '.join(['?'] * len(chunk))
+                self.session.sql(f"DELETE FROM {table} WHERE {key_column} IN ({placeholders})", params=chunk).collect()
+            if staging:
+                self._insert_staged(table, staging, frame.columns, variant_columns)
+            self.session.sql("COMMIT").collect()
+        except Exception:
+            self.session.sql("ROLLBACK").collect()
+            raise
+
+    def append_rows(self, table, frame, variant_columns=()):
+        """Append a DataFrame; JSON text in variant_columns is loaded with PARSE_JSON"""
+        database, schema, name = table.split('.')
+        if not variant_columns:
+            self.session.write_pandas(frame, name, database=database, schema=schema)
+            return
+        self._insert_staged(table, self._stage(table, frame, 'APPEND'), frame.columns, variant_columns)
+
+    def _table_exists(self, table):
+        database, schema, name = table.split('.')
+        row = self.sql(f"""
+        SELECT COUNT(*) AS N FROM {database}.INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?
+        """, params=[schema, name])
+        return bool(row['N'].iloc[0])
+
+    def _stage(self, table, frame, purpose):
+        """Load frame into a session-scoped temporary table next to table; returns its name"""
+        database, schema, name = table.split('.')
+        staging = f"{name}_{purpose}_STAGING"
+        self.session.write_pandas(frame, staging, database=database, schema=schema, auto_create_table=True,
+                                  overwrite=True, table_type='temporary')
+        return f"{database}.{schema}.{staging}"
+
+    def _insert_staged(self, table, staging, columns, variant_columns=()):
+        values = ', '.join(f'PARSE_JSON({column})' if column in variant_columns else column for column in columns)
+        self.session.sql(f"INSERT INTO {table} ({', '.join(columns)}) SELECT {values} FROM {staging}").collect()
+
+
+class LocalSource:
+    """In-process DuckDB over exported Parquet files, answering the app's Snowflake queries"""
+
+    name = 'local'
+
+    def __init__(self, data_dir):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("The local backend requires duckdb (pip install duckdb)") from e
+        self.data_dir = data_dir
+        self._conn = duckdb.connect(':memory:')
+        self._lock = threading.Lock()
+        self._conn.execute("ATTACH ':memory:' AS HACKATHON_2025")
+        for schema in sorted({table.split('.')[1] for table in TABLE_SCHEMAS}):
+            self._conn.execute(f"CREATE SCHEMA IF NOT EXISTS HACKATHON_2025.{schema}")
+        for table in TABLE_SCHEMAS:
+            self.register(table)
+
+    @property
+    def key(self):
+        """Hashable identity of the data behind this source (its replica directory)"""
+        return (self.name, os.path.abspath(self.data_dir))
+
+    def register(self, table):
+        """(Re)bind a table to its Parquet data, or to an empty table with the Snowflake schema"""
+        path = self.table_path(table)
+        database, schema, name = table.split('.')
+        with self._lock:
+            existing = self._conn.execute(
+                "SELECT table_type FROM information_schema.tables "
+                "WHERE table_catalog = ? AND table_schema = ? AND table_name = ?",
+                [database, schema, name]
+            ).fetchone()
+            if existing:
+                self._conn.execute(f"DROP {'VIEW' if existing[0] == 'VIEW' else 'TABLE'} {table}")
+            if os.path.exists(path):
+                pattern = os.path.join(path, '*.parquet') if os.path.isdir(path) else path
+                self._conn.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{pattern}', union_by_name = true)")
+            else:
+                columns = ', '.join(f'{column} {DUCKDB_TYPES[kind]}' for column, kind in TABLE_SCHEMAS[table])
+                self._conn.execute(f"CREATE TABLE {table} ({columns})")
+
+    def table_path(self, table):
+        return os.path.join(self.data_dir, table_file_name(table))
+
+    def sql(self, query, params=None):
+        # Each call gets its own cursor so the source can be shared across Streamlit threads
+        with self._lock:
+            cursor = self._conn.cursor()
+        try:
+            result = cursor.execute(query, params or []).df()
+        finally:
+            cursor.close()
+        # Snowflake upper-cases unquoted identifiers; mirror that so callers see the same columns
+        result.columns = [str(column).upper() for column in result.columns]
+        return result
+
+    def table_version(self, table):
+        """(newest mtime, total bytes) of the files backing a table"""
+        path = self.table_path(table)
+        if not os.path.exists(path):
+            return None
+        files = [path]
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.parquet')]
+        stats = [os.stat(name) for name in files]
+        return (str(max((st.st_mtime_ns for st in stats), default=0)), str(sum(st.st_size for st in stats)))
+
+    def write_table(self, table, frame, variant_columns=()):
+        """Replace a table's Parquet data with a DataFrame (VARIANT columns stay JSON text)"""
+        path = self.table_path(table)
+        os.makedirs(self.data_dir, exist_ok=True)
+        tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+        frame.to_parquet(tmp, index=False)
+        # Swap the file in atomically so concurrent readers see the old or the new data, never half.
+        # A part directory cannot be replaced by a file in one step: it is renamed aside first and
+        # only deleted once the new file is in place, so a failed write never loses the table
+        old = None
+        if os.path.isdir(path):
+            old = f'{path}.{uuid.uuid4().hex}.old'
+            os.replace(path, old)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            if old is not None:
+                os.replace(old, path)
+            raise
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+        self.register(table)
+
+    def replace_rows(self, table, key_column, keys, frame, variant_columns=()):
+        """Delete the rows whose key_column is in keys and append frame"""
+        kept = self.sql(
+            f"SELECT * FROM {table} WHERE {key_column} IS NULL OR NOT list_contains(?, {key_column})",
+            params=[[str(key) for key in keys]]
+        )
+        if len(frame):
+            kept = pd.concat([kept, frame.reindex(columns=kept.columns)], ignore_index=True)
+        self.write_table(table, kept)
+
+    def append_rows(self, table, frame, variant_columns=()):
+        """Append a DataFrame as a new part file; the table becomes a directory of parts"""
+        path = self.table_path(table)
+        if os.path.isfile(path):
+            # Promote a single-file table to a part directory before adding to it
+            tmp = path + '.parts'
+            os.makedirs(tmp, exist_ok=True)
+            os.replace(path, os.path.join(tmp, 'part-00000.parquet'))
+            os.replace(tmp, path)
+        os.makedirs(path, exist_ok=True)
+        columns = [column for column, _ in TABLE_SCHEMAS[table]] if table in TABLE_SCHEMAS else list(frame.columns)
+        # Unique and in write order, so concurrent appends never pick the same name
+        part = os.path.join(path, f'part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet')
+        frame.reindex(columns=columns).to_parquet(part + '.tmp', index=False)
+        os.replace(part + '.tmp', part)
+        self.register(table)
+
+
+def export_tables(source, data_dir, tables=None):
+    """Copy tables from a source (normally Snowflake) into Parquet files for the local replica"""
+    os.makedirs(data_dir, exist_ok=True)
+    written = {}
+    for table in tables or TABLE_SCHEMAS:
+        frame = source.sql(f"SELECT * FROM {table}")
+        path = os.path.join(data_dir, table_file_name(table))
+        frame.to_parquet(path, index=False)
+        written[table] = len(frame)
+    return written
+
+
+def open_default_source():
+    """Local replica if RESUME_MATCHER_DATA_DIR is set, else the active Snowpark session, else None"""
+    data_dir = os.environ.get(DATA_DIR_ENV)
+    if data_dir:
+        return LocalSource(data_dir)
+    try:
+        from snowflake.snowpark.context import get_active_session
+        return SnowparkSource(get_active_session())
+    except Exception:
+        return None
@@ -0,0 +1,193 @@
+"""Embeddings stored once per RESUME_ID / REQ_ID as memory-mapped float32 rows"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+META_FILE = 'meta.json'
+VECTORS_FILE = 'vectors.f32'
+DIGESTS_FILE = 'digests.u64'
+IDS_FILE = 'ids.txt'
+# Name of the live version directory under a store path; rewritten (atomically) by every write
+CURRENT_FILE = 'CURRENT'
+VERSION_PREFIX = 'v-'
+
+# Sub-directories of a store root, one store per entity
+RESUME_STORE = 'resumes'
+REQ_STORE = 'reqs'
+
+
+def text_digests(texts):
+    """64-bit digest of each embedded text, so unchanged entities are not embedded again"""
+    return np.array([int.from_bytes(hashlib.blake2b(str(text).encode('utf-8'), digest_size=8).digest(), 'little')
+                     for text in texts], dtype=np.uint64)
+
+
+def embedder_key(embedder):
+    """Identity of an embedder; vectors from a different one are never reused"""
+    detail = getattr(embedder, 'model', None) or getattr(embedder, 'dim', None)
+    return f'{type(embedder).__name__}:{detail}'
+
+
+class EmbeddingStore:
+    """Read-only view of one store: ids, text digests and an (n, dim) float32 memmap"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.dim = self.meta['dim']
+        self.count = self.meta['count']
+        with open(os.path.join(path, IDS_FILE)) as f:
+            self.ids = [line.rstrip('\n') for line in f][:self.count]
+        self.rows = {item_id: row for row, item_id in enumerate(self.ids)}
+        if self.count:
+            # Rows are mapped straight from the file: no copy, no parsing
+            self.vectors = np.memmap(os.path.join(path, VECTORS_FILE), dtype=np.float32, mode='r',
+                                     shape=(self.count, self.dim))
+            self.digests = np.fromfile(os.path.join(path, DIGESTS_FILE), dtype=np.uint64, count=self.count)
+        else:
+            self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+            self.digests = np.zeros(0, dtype=np.uint64)
+
+    def __len__(self):
+        return self.count
+
+    @classmethod
+    def open(cls, path):
+        """The live version of the store at path, or None if none has been written"""
+        version = cls._current(path)
+        if version is not None:
+            return cls(os.path.join(path, version))
+        # Stores written before versioning keep their files directly under path
+        if os.path.exists(os.path.join(path, META_FILE)):
+            return cls(path)
+        return None
+
+    @staticmethod
+    def _current(path):
+        try:
+            with open(os.path.join(path, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def write(cls, path, ids, vectors, digests=None, embedder=None):
+        """Replace the store at path and return it
+
+        Every write goes to a new version directory; the CURRENT pointer is swapped
+        to it in one rename, so readers see the old store or the new one, never a
+        mix. The version it replaced is kept for readers still mapping it; older
+        ones are removed.
+        """
+        ids = [str(item_id) for item_id in ids]
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        if digests is None:
+            digests = np.zeros(len(ids), dtype=np.uint64)
+        previous = cls._current(path)
+        version = f'{VERSION_PREFIX}{uuid.uuid4().hex}'
+        version_dir = os.path.join(path, version)
+        os.makedirs(version_dir)
+        vectors.tofile(os.path.join(version_dir, VECTORS_FILE))
+        np.asarray(digests, dtype=np.uint64).tofile(os.path.join(version_dir, DIGESTS_FILE))
+        with open(os.path.join(version_dir, IDS_FILE), 'w') as f:
+            f.writelines(item_id + '\n' for item_id in ids)
+        meta = {'dim': int(vectors.shape[1]), 'count': len(ids),
+                'embedder': embedder_key(embedder) if embedder is not None else None}
+        with open(os.path.join(version_dir, META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+        tmp = os.path.join(path, CURRENT_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(path, CURRENT_FILE))
+        for name in os.listdir(path):
+            if name.startswith(VERSION_PREFIX) and name not in (version, previous):
+                shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+        return cls(version_dir)
+
+    def lookup(self, ids):
+        """Row of each id in the store, -1 where it is missing"""
+        return np.array([self.rows.get(str(item_id), -1) for item_id in ids], dtype=np.int64)
+
+    def get(self, ids):
+        """(vectors, found mask) for ids; rows of missing ids are zero"""
+        rows = self.lookup(ids)
+        found = rows >= 0
+        vectors = np.zeros((len(rows), self.dim), dtype=np.float32)
+        vectors[found] = self.vectors[rows[found]]
+        return vectors, found
+
+
+def embed_with_store(path, ids, texts, embedder):
+    """Vectors for (id, text) pairs, embedding only ids that are new or whose text changed
+
+    Every entity already in the store is kept, so partial batches (incremental
+    refreshes) add to it rather than replace it. Returns (vectors, number embedded).
+    """
+    ids = [str(item_id) for item_id in ids]
+    digests = text_digests(texts)
+    store = EmbeddingStore.open(path)
+    if store is not None and store.meta.get('embedder') != embedder_key(embedder):
+        store = None
+
+    reuse = np.zeros(len(ids), dtype=bool)
+    rows = np.full(len(ids), -1, dtype=np.int64)
+    if store is not None:
+        rows = store.lookup(ids)
+        reuse = rows >= 0
+        reuse[reuse] = store.digests[rows[reuse]] == digests[reuse]
+
+    missing = np.flatnonzero(~reuse)
+    fresh = embedder.embed([texts[i] for i in missing]) if len(missing) or store is None else None
+    dim = fresh.shape[1] if fresh is not None else store.dim
+    vectors = np.empty((len(ids), dim), dtype=np.float32)
+    if reuse.any():
+        vectors[reuse] = store.vectors[rows[reuse]]
+    if fresh is not None:
+        vectors[missing] = fresh
+
+    if len(missing):
+        # Last occurrence wins when an id appears twice in one batch
+        batch = dict(zip(ids, range(len(ids))))
+        kept = [row for row, item_id in enumerate(store.ids) if item_id not in batch] if store is not None else []
+        batch_rows = np.fromiter(batch.values(), dtype=np.int64, count=len(batch))
+        EmbeddingStore.write(
+            path,
+            [store.ids[row] for row in kept] + list(batch),
+            np.concatenate([np.asarray(store.vectors[kept]) if kept else np.zeros((0, dim), np.float32),
+                            vectors[batch_rows]]),
+            np.concatenate([store.digests[kept] if kept else np.zeros(0, np.uint64), digests[batch_rows]]),
+            embedder,
+        )
+    return vectors, len(missing)
+
+
+def import_embeddings(source, table, id_column, path, embedder, embedding_column='EMBEDDING', texts=None):
+    """Copy an embeddings table (one VECTOR per id, as built in "05 - Load into Gold layer.sql") into a local store
+
+    embedder is the one that produced the table (e.g. CortexEmbedder with the same
+    model), so local builds with it reuse the imported vectors. texts ({id: embedded
+    text}, optional) records each row's text digest; rows without one are embedded
+    again the first time a build sees them.
+    """
+    frame = source.sql(f"SELECT {id_column}, {embedding_column} FROM {table}")
+    if frame.empty:
+        raise ValueError(f"{table} has no embeddings to import")
+    values = frame[embedding_column]
+    if len(values) and isinstance(values.iloc[0], str):
+        # VECTOR/VARIANT columns come back as JSON text; parse the whole column at once
+        vectors = np.array(json.loads('[' + ','.join(values) + ']'), dtype=np.float32)
+    else:
+        vectors = np.array([np.asarray(value, dtype=np.float32) for value in values], dtype=np.float32)
+    ids = frame[id_column].astype(str).tolist()
+    digests = None
+    if texts is not None:
+        texts = {str(item_id): text for item_id, text in texts.items()}
+        digests = text_digests([texts.get(item_id, '') for item_id in ids])
+        digests[[item_id not in texts for item_id in ids]] = 0
+    return EmbeddingStore.write(path, ids, vectors.reshape(len(frame), -1), digests, embedder)
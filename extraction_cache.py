@@ -0,0 +1,280 @@
+"""Content-hash cache for AI_EXTRACT responses, so re-runs only extract new or changed inputs"""
+import hashlib
+import json
+import sqlite3
+import threading
+
+import pandas as pd
+
+from data_sources import SILVER_JOBS_TABLE
+
+DEFAULT_CACHE_PATH = 'extraction_cache.sqlite'
+RESUME_STAGE = '@hackathon_2025.joe.reqs_resumes'
+
+# responseFormat from "04 - Extract Resume.sql"
+RESUME_RESPONSE_FORMAT = {
+    'job_1': 'What is the most recent or current job title of this person?',
+    'years_of_experience': 'How many total years of work experience does this person have? Provide just the number.',
+    'technical_skills': 'List: What are the technical skills mentioned in this resume?',
+    'additional_skills': 'List: What are the additional non-technical skills mentioned in this resume?',
+    'certifications': 'List: What certifications does this person have?',
+    'job_titles_list': 'List: What are all the job titles this person has held?',
+    'has_doctorate': 'Does this person have a doctorate degree? Answer true or false.',
+    'has_masters': 'Does this person have a masters degree? Answer true or false.',
+    'has_bachelors': 'Does this person have a bachelors degree? Answer true or false.',
+    'has_high_school': 'Does this person have a high school diploma or equivalent? Answer true or false.',
+    'doctorate_name': 'What is the name or field of the doctorate degree?',
+    'masters_name': 'What is the name or field of the masters degree?',
+    'bachelors_name': 'What is the name or field of the bachelors degree?',
+    'community_volunteer_bool': 'Has the person done any volunteering or community work?',
+    'community_volunteer': 'What volunteering or community work has the person done?',
+    'spoken_languages_bool': 'Does the person speak non-english languages?',
+    'spoken_languages': 'What spoken human languages does the person speak?',
+    'programming_languages': 'What programming languages can the person write?',
+    'college_sports': 'Did the candidate play sports in college?',
+    'college_sports_division': 'If the person played college sports, what division did they play? If they did not play sports answer NULL',
+    'personal_interests': 'What personal interests does the candidate have?',
+    'Interesting': 'Was there anything interesting or abnormal listed in the individuals resume?',
+    'leadership_experience_bool': 'Does the person have any leadership experience?',
+    'leadership_experience': 'What leadership experience does the person have?',
+}
+
+# responseFormat from "03 - Extract Raw Data.sql"
+JOBREQ_RESPONSE_FORMAT = {
+    'job_1': 'What is the job title in the requisition?',
+    'years_of_experience': 'How many total years of work experience does the position listed require? Provide just the number.',
+    'technical_skills': 'List: What are the technical skills mentioned in the job requisition',
+    'additional_skills': 'List: What are the additional non-technical skills mentioned in this job requisition?',
+    'certifications': 'List: What certifications does this job requisition require?',
+    'job_titles_list': 'What is the job title in the requisition?',
+    'has_doctorate': 'Does this position require a doctorate degree? Answer true or false.',
+    'has_masters': 'Does this position require a masters degree? Answer true or false.',
+    'has_bachelors': 'Does this position require a bachelors degree? Answer true or false.',
+    'has_high_school': 'Does this position require a high school diploma or equivalent? Answer true or false.',
+    'doctorate_name': 'What is the name or field of the doctorate degree required?',
+    'masters_name': 'What is the name or field of the masters degree required?',
+    'bachelors_name': 'What is the name or field of the bachelors degree required?',
+    'spoken_languages_bool': 'Does the position require non-english languages?',
+    'spoken_languages': 'What spoken human languages does the position require?',
+    'programming_languages': 'What programming languages does the position require?',
+    'leadership_experience_bool': 'Does the positoin require any leadership experience?',
+    'leadership_experience': 'What leadership experience does the position require?',
+}
+
+
+def extractor_key(extractor):
+    """Identity of an extractor: its class and version; responses from any other are never reused"""
+    return f'{type(extractor).__name__}:{getattr(extractor, "version", None)}'
+
+
+def prompt_hash(response_format, extractor=None):
+    """Stable hash of a responseFormat prompt set and the extractor answering it
+
+    Any wording change, or a different extractor or extractor version, invalidates cached responses.
+    """
+    key = {'format': response_format, 'extractor': extractor_key(extractor) if extractor is not None else None}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def is_cacheable(response):
+    """True for a response worth keeping: no error and at least one non-empty answer
+
+    >>> is_cacheable({'response': {'job_1': 'Chemist', 'certifications': None}})
+    True
+    >>> [is_cacheable(r) for r in (None, {'error': 'timeout'}, {'response': {'job_1': None, 'skills': []}})]
+    [False, False, False]
+    """
+    if not isinstance(response, dict) or response.get('error'):
+        return False
+    answers = response.get('response')
+    if not isinstance(answers, dict):
+        return False
+    return any(value not in (None, '', [], {}) for value in answers.values())
+
+
+def content_hash(content):
+    """SHA-256 of text or bytes"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """SQLite store of extraction responses keyed by (content hash, prompt hash)"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                content_hash TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                extracted_at TEXT NOT NULL,
+                PRIMARY KEY (content_hash, prompt_hash)
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, content_hashes, prompt_key):
+        """{content_hash: (response, extracted_at)} for the hashes already in the cache"""
+        found = {}
+        hashes = list(dict.fromkeys(content_hashes))
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT content_hash, response, extracted_at FROM extractions "
+                    f"WHERE prompt_hash = ? AND content_hash IN ({', '.join(['?'] * len(chunk))})",
+                    [prompt_key] + chunk
+                ).fetchall()
+                for key, response, extracted_at in rows:
+                    found[key] = (json.loads(response), pd.Timestamp(extracted_at))
+        return found
+
+    def put_many(self, entries, prompt_key, extracted_at):
+        """Store {content_hash: response} under one prompt hash"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?)",
+                [(key, prompt_key, json.dumps(response), extracted_at.isoformat()) for key, response in entries.items()]
+            )
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class NullExtractor:
+    """Extractor stand-in that answers every prompt with NULL; useful offline and in tests"""
+
+    version = 1
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract(self, payloads, response_format):
+        self.calls += 1
+        return [{'response': {key: None for key in response_format}} for _ in payloads]
+
+
+class CortexTextExtractor:
+    """AI_EXTRACT over text, one statement per batch"""
+
+    # Bump when the statement changes in a way that changes responses
+    version = 1
+
+    def __init__(self, source, batch_size=100):
+        self.source = source
+        self.batch_size = batch_size
+
+    def extract(self, payloads, response_format):
+        responses = []
+        for start in range(0, len(payloads), self.batch_size):
+            batch = payloads[start:start + self.batch_size]
+            result = self.source.sql("""
+            SELECT f.index AS IDX,
+                   AI_EXTRACT(TEXT => f.value::STRING, responseFormat => PARSE_JSON(?)::OBJECT) AS EXTRACTED_INFO
+            FROM TABLE(FLATTEN(INPUT => PARSE_JSON(?))) f
+            ORDER BY f.index
+            """, params=[json.dumps(response_format), json.dumps(list(batch))])
+            responses.extend(_as_object(value) for value in result['EXTRACTED_INFO'])
+        return responses
+
+
+class CortexFileExtractor:
+    """AI_EXTRACT over staged files (payloads are stage-relative paths)"""
+
+    version = 1
+
+    def __init__(self, source, stage=RESUME_STAGE, batch_size=100):
+        self.source = source
+        self.stage = stage
+        self.batch_size = batch_size
+
+    def extract(self, payloads, response_format):
+        responses = []
+        for start in range(0, len(payloads), self.batch_size):
+            batch = payloads[start:start + self.batch_size]
+            result = self.source.sql(f"""
+            SELECT f.index AS IDX,
+                   AI_EXTRACT(file => TO_FILE('{self.stage}', f.value::STRING),
+                              responseFormat => PARSE_JSON(?)::OBJECT) AS EXTRACTED_INFO
+            FROM TABLE(FLATTEN(INPUT => PARSE_JSON(?))) f
+            ORDER BY f.index
+            """, params=[json.dumps(response_format), json.dumps(list(batch))])
+            responses.extend(_as_object(value) for value in result['EXTRACTED_INFO'])
+        return responses
+
+
+def _as_object(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def cached_extract(hashes, payloads, response_format, extractor, cache):
+    """Responses for each input, calling the extractor only for cache misses
+
+    Returns (responses, extracted_at, stats); inputs with identical content are extracted once.
+    Responses are cached per prompt set and extractor version; failed or empty responses are
+    returned but not stored, so the next run asks again.
+    """
+    prompt_key = prompt_hash(response_format, extractor)
+    found = cache.get_many(hashes, prompt_key)
+    missing = {}
+    for key, payload in zip(hashes, payloads):
+        if key not in found and key not in missing:
+            missing[key] = payload
+    if missing:
+        now = pd.Timestamp.now(tz='UTC')
+        responses = extractor.extract(list(missing.values()), response_format)
+        fresh = dict(zip(missing.keys(), responses))
+        cache.put_many({key: response for key, response in fresh.items() if is_cacheable(response)}, prompt_key, now)
+        found.update({key: (response, now) for key, response in fresh.items()})
+    uncached = sum(not is_cacheable(found[key][0]) for key in missing)
+    stats = {'inputs': len(hashes), 'extracted': len(missing), 'reused': len(hashes) - len(missing),
+             'uncached': uncached}
+    return [found[key][0] for key in hashes], [found[key][1] for key in hashes], stats
+
+
+def extract_stage_resumes(source, extractor, cache, stage=RESUME_STAGE):
+    """RESUME_PDF_EXTRACTIONS rows for every PDF on the stage, keyed by the directory table's MD5"""
+    files = source.sql(f"""
+    SELECT relative_path AS RELATIVE_PATH, file_url AS FILE_URL, md5 AS MD5
+    FROM DIRECTORY({stage})
+    WHERE UPPER(relative_path) LIKE '%.PDF'
+    """)
+    paths = files['RELATIVE_PATH'].tolist()
+    responses, extracted_at, stats = cached_extract(files['MD5'].tolist(), paths, RESUME_RESPONSE_FORMAT, extractor, cache)
+    return pd.DataFrame({
+        'RELATIVE_PATH': paths,
+        'FILE_URL': files['FILE_URL'],
+        'EXTRACTION_TIMESTAMP': extracted_at,
+        'CATEGORY': [path.split('/')[0] for path in paths],
+        'RESUME_ID': [path.split('/')[1] if '/' in path else '' for path in paths],
+        'EXTRACTED_INFO': responses,
+    }), stats
+
+
+def extract_job_listings(source, extractor, cache):
+    """JOBREQ_EXTRACTIONS rows for every job description in the silver table"""
+    listings = source.sql(f"SELECT REQ_ID, CATEGORY, JOB_DESCRIPTION FROM {SILVER_JOBS_TABLE}")
+    descriptions = listings['JOB_DESCRIPTION'].fillna('').astype(str).tolist()
+    responses, extracted_at, stats = cached_extract(
+        [content_hash(text) for text in descriptions], descriptions, JOBREQ_RESPONSE_FORMAT, extractor, cache
+    )
+    return pd.DataFrame({
+        'EXTRACTION_TIMESTAMP': extracted_at,
+        'REQ_ID': listings['REQ_ID'],
+        'CATEGORY': listings['CATEGORY'],
+        'EXTRACTED_INFO': responses,
+    }), stats
@@ -0,0 +1,259 @@
+"""In-memory snapshot of GOLD_TABLE_COMPARISONS shared by every app session"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_sources import GOLD_TABLE, JOBREQ_TABLE, JOBS_DIM_TABLE, RESUME_TABLE
+from jobs_dimension import JobDirectory, build_jobs_dimension, read_jobs_dimension
+from rerank import (REQ_DEGREE_FLAGS, RESUME_DEGREE_FLAGS, degree_fit, degree_levels, experience_fit,
+                    rerank)
+from skill_index import SkillIndex
+
+# Only the per-candidate columns the UI reads are pulled into memory (no embedding VARIANTs);
+# per-req columns come from JOBS_DIM instead of being repeated on every candidate row
+SNAPSHOT_QUERY = f"""
+SELECT
+    REQ_ID,
+    RESUME_ID,
+    MATCH_SCORE,
+    RANK_WITHIN_REQ,
+    RESUME_CURRENT_JOB,
+    RESUME_YOE,
+    RESUME_TECH_SKILLS,
+    FILE_PATH
+FROM {GOLD_TABLE}
+WHERE REQ_ID IS NOT NULL
+ORDER BY REQ_ID, RANK_WITHIN_REQ
+"""
+
+# One read of the resume table feeds both the skill index and the degree levels used for re-ranking
+RESUME_PROFILE_QUERY = f"""
+SELECT FILE_PATH, TECHNICAL_SKILLS, PROGRAMMING_LANGUAGES,
+    {', '.join(column for column, _ in RESUME_DEGREE_FLAGS)}
+FROM {RESUME_TABLE}
+WHERE FILE_PATH IS NOT NULL
+"""
+
+REQ_REQUIREMENTS_QUERY = f"""
+SELECT REQ_ID, YEARS_OF_EXPERIENCE_REQUIRED,
+    {', '.join(column for column, _ in REQ_DEGREE_FLAGS)}
+FROM {JOBREQ_TABLE}
+WHERE REQ_ID IS NOT NULL
+"""
+
+
+class GoldSnapshot:
+    """Read-only columnar copy of the gold table with a REQ_ID index, plus the job directory and skill index
+
+    resume_degrees holds the degree level of each skill index row; req_requirements is
+    REQ_REQUIREMENTS_QUERY's result. Either may be None, which drops that re-ranking factor.
+    """
+
+    def __init__(self, gold_df, version=None, jobs_dim=None, skill_index=None, resume_degrees=None,
+                 req_requirements=None):
+        self.version = version
+        self.loaded_at = time.time()
+
+        gold_df = gold_df.sort_values(['REQ_ID', 'RANK_WITHIN_REQ'], kind='stable').reset_index(drop=True)
+
+        # Candidate rows in the exact shape get_candidates() has always returned
+        self.candidates_df = pd.DataFrame({
+            'NAME': 'Candidate ' + gold_df['RESUME_ID'].astype(str).str.replace('.pdf', '', regex=False),
+            'MATCH_SCORE': (gold_df['MATCH_SCORE'].astype('float64') * 100).round(0),
+            'RANK': gold_df['RANK_WITHIN_REQ'],
+            'CURRENT_ROLE': gold_df['RESUME_CURRENT_JOB'].fillna('Not specified'),
+            'YEARS_EXPERIENCE': gold_df['RESUME_YOE'].fillna(0),
+            'TECH_SKILLS': gold_df['RESUME_TECH_SKILLS'].fillna('Not specified'),
+            'FILE_PATH': gold_df['FILE_PATH'],
+        })
+
+        self._ranks = gold_df['RANK_WITHIN_REQ'].to_numpy()
+        # Unrounded factors for re-ranking
+        self._match = gold_df['MATCH_SCORE'].to_numpy(dtype=np.float64, na_value=0.0)
+        self._resume_yoe = gold_df['RESUME_YOE'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        # REQ_ID -> (start, stop) row range into candidates_df
+        req_ids = gold_df['REQ_ID'].to_numpy()
+        self.req_ranges = {}
+        if len(req_ids):
+            starts = np.concatenate(([0], np.flatnonzero(req_ids[1:] != req_ids[:-1]) + 1))
+            stops = np.append(starts[1:], len(req_ids))
+            self.req_ranges = {req_ids[s]: (int(s), int(e)) for s, e in zip(starts, stops)}
+
+        # Skill index row of every candidate row, for in-memory skill filters and degree levels
+        self.skills = skill_index
+        self._resume_rows = skill_index.lookup(gold_df['FILE_PATH'].tolist()) if skill_index is not None else None
+        self._degrees = None
+        if self._resume_rows is not None and resume_degrees is not None:
+            # Resumes missing from the index (-1) pick up the trailing "no degree" slot
+            self._degrees = np.append(resume_degrees, 0).astype(np.int8)[self._resume_rows]
+
+        # REQ_ID -> (years of experience required, degree level required)
+        self.requirements = {}
+        if req_requirements is not None and not req_requirements.empty:
+            self.requirements = dict(zip(
+                req_requirements['REQ_ID'].tolist(),
+                zip(req_requirements['YEARS_OF_EXPERIENCE_REQUIRED'].to_numpy(dtype=np.float64, na_value=np.nan),
+                    degree_levels(req_requirements, REQ_DEGREE_FLAGS).tolist()),
+            ))
+
+        # Job list and departments come from the one-row-per-req dimension
+        self.directory = JobDirectory(jobs_dim if jobs_dim is not None else build_jobs_dimension(gold_df))
+        self.jobs = self.directory.jobs
+        self.jobs_original = self.directory.jobs_original
+        self.categories = self.directory.categories
+
+    def candidates(self, job_id):
+        """Candidates for one req, ordered by rank"""
+        start, stop = self.req_ranges.get(job_id, (0, 0))
+        return self.candidates_df.iloc[start:stop]
+
+    def candidates_page(self, job_id, after_rank=0, limit=20):
+        """(up to limit candidates ranked after after_rank, whether more follow) for one req"""
+        start, stop = self.req_ranges.get(job_id, (0, 0))
+        # Ranks are sorted within a req, so the keyset cursor is a binary search
+        first = start + int(np.searchsorted(self._ranks[start:stop], after_rank, side='right'))
+        last = min(first + limit, stop)
+        return self.candidates_df.iloc[first:last], last < stop
+
+    def ranked_candidates(self, job_id, weights=None, must=(), nice=(), limit=None):
+        """(top limit candidates, number ranked) for one req re-ranked by weighted match, experience, degree and skills
+
+        Only candidates holding every must-have skill are kept. Factors the snapshot
+        has no data for (no skill index, req missing from JOBREQ_FLATTENED) are left out.
+        """
+        start, stop = self.req_ranges.get(job_id, (0, 0))
+        factors = {'match': self._match[start:stop]}
+        requirement = self.requirements.get(job_id)
+        if requirement is not None:
+            factors['experience'] = experience_fit(self._resume_yoe[start:stop], requirement[0])
+            if self._degrees is not None:
+                factors['degree'] = degree_fit(self._degrees[start:stop], requirement[1])
+        mask = None
+        if (must or nice) and self.skills is not None:
+            mask, factors['skills'] = self.skills.match(self._resume_rows[start:stop], must, nice)
+        return rerank(self.candidates_df.iloc[start:stop], factors, weights, mask, limit)
+
+    def jobs_for(self, category, search=''):
+        """Jobs for a department (or every job for 'All'), narrowed by a text search"""
+        return self.directory.jobs_for(category, search)
+
+
+class GoldSnapshotCache:
+    """Holds the current GoldSnapshot and swaps in a new one when the table changes
+
+    A failed first load is remembered: get() returns None (callers fall back to
+    per-req queries) until retry_interval seconds have passed, doubling after
+    each further failure up to max_retry_interval.
+    """
+
+    def __init__(self, source, poll_interval=60, executor=None, retry_interval=30, max_retry_interval=600):
+        self.source = source
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self._retry_at = None
+        self._failures = 0
+        # With an executor the candidate and jobs dimension reads run concurrently
+        self.executor = executor
+        self.last_error = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def loaded(self):
+        return self._snapshot is not None
+
+    def get(self):
+        """Return the current snapshot, loading it on first use
+
+        The load that fails raises; later calls return None until the retry time.
+        """
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    if self._retry_at is not None and time.monotonic() < self._retry_at:
+                        return None
+                    try:
+                        self._snapshot = self._load(self._probe_version())
+                    except Exception as e:
+                        self.last_error = e
+                        self._failures += 1
+                        backoff = min(self.retry_interval * 2 ** (self._failures - 1), self.max_retry_interval)
+                        self._retry_at = time.monotonic() + backoff
+                        raise
+                    self._failures = 0
+                    self._retry_at = None
+                    self._start_refresher()
+        return self._snapshot
+
+    def refresh(self, force=False):
+        """Reload the snapshot if the table version moved; returns True when swapped"""
+        version = self._probe_version()
+        current = self._snapshot
+        # An unreadable version is treated as unchanged so a failing probe cannot cause reload storms
+        if not force and current is not None and (version is None or version == current.version):
+            return False
+        snapshot = self._load(version)
+        # Attribute assignment is atomic; readers keep whichever snapshot they already hold
+        self._snapshot = snapshot
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def _load(self, version):
+        if self.executor is None:
+            return GoldSnapshot(self.source.sql(SNAPSHOT_QUERY), version, read_jobs_dimension(self.source),
+                                *self._load_resume_profiles(), self._load_req_requirements())
+        jobs_dim = self.executor.submit(read_jobs_dimension, self.source)
+        profiles = self.executor.submit(self._load_resume_profiles)
+        requirements = self.executor.submit(self._load_req_requirements)
+        gold_df = self.source.sql(SNAPSHOT_QUERY)
+        return GoldSnapshot(gold_df, version, jobs_dim.result(), *profiles.result(), requirements.result())
+
+    def _load_resume_profiles(self):
+        # Skill filters and degree re-ranking are optional; candidates are still served without them
+        try:
+            resumes = self.source.sql(RESUME_PROFILE_QUERY)
+            return SkillIndex.from_resumes(resumes), degree_levels(resumes, RESUME_DEGREE_FLAGS)
+        except Exception as e:
+            self.last_error = e
+            return None, None
+
+    def _load_req_requirements(self):
+        try:
+            return self.source.sql(REQ_REQUIREMENTS_QUERY)
+        except Exception as e:
+            self.last_error = e
+            return None
+
+    def _probe_version(self):
+        # The dimension is rewritten right after the gold table; a change to any of the tables reloads all
+        try:
+            version = self.source.table_version(GOLD_TABLE)
+            if version is None:
+                return None
+            return (version,) + tuple(self.source.table_version(table)
+                                      for table in (JOBS_DIM_TABLE, RESUME_TABLE, JOBREQ_TABLE))
+        except Exception as e:
+            self.last_error = e
+            return None
+
+    def _start_refresher(self):
+        if self.poll_interval and self._thread is None:
+            self._thread = threading.Thread(target=self._refresh_loop, name="gold-snapshot-refresh", daemon=True)
+            self._thread.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # Keep serving the previous snapshot until the next successful poll
+                self.last_error = e
@@ -0,0 +1,157 @@
+"""Incremental GOLD_TABLE_COMPARISONS refresh driven by EXTRACTION_TIMESTAMP watermarks"""
+import json
+import os
+
+import pandas as pd
+
+from data_sources import GOLD_TABLE, JOBREQ_TABLE, JOBS_DIM_TABLE, RESUME_TABLE, fetch_where_in
+from jobs_dimension import (JOBS_DIM_VARIANT_COLUMNS, build_jobs_dimension, read_departments, rebuild_jobs_dimension,
+                            seed_departments)
+from scoring import GOLD_COLUMNS, HashingEmbedder, score_gold
+
+DEFAULT_STATE_PATH = 'gold_watermarks.json'
+# Watermark of a table that had no timestamped rows when it was last read: every row extracted later is new
+EMPTY_WATERMARK = pd.Timestamp('1900-01-01', tz='UTC')
+
+
+def load_watermarks(path):
+    """{'initialized': bool, 'resumes': Timestamp|None, 'reqs': Timestamp|None} from the state file
+
+    Watermarks are None only before the first build; afterwards a table without
+    timestamped rows has EMPTY_WATERMARK.
+    """
+    if not os.path.exists(path):
+        return {'initialized': False, 'resumes': None, 'reqs': None}
+    with open(path) as f:
+        state = json.load(f)
+    watermarks = {key: pd.Timestamp(state[key]) if state.get(key) else EMPTY_WATERMARK for key in ('resumes', 'reqs')}
+    return {'initialized': True, **watermarks}
+
+
+def save_watermarks(path, watermarks):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({key: watermarks[key].isoformat() if watermarks[key] is not None else None
+                   for key in ('resumes', 'reqs')}, f)
+    os.replace(tmp, path)
+
+
+def rerank_reqs(gold, top_k=None):
+    """Recompute RANK_WITHIN_REQ from MATCH_SCORE within each REQ_ID, keeping the top_k rows"""
+    gold = gold.sort_values(['REQ_ID', 'MATCH_SCORE'], ascending=[True, False], kind='stable')
+    gold['RANK_WITHIN_REQ'] = gold.groupby('REQ_ID', sort=False).cumcount() + 1
+    if top_k is not None:
+        gold = gold[gold['RANK_WITHIN_REQ'] <= top_k]
+    return gold.reset_index(drop=True)
+
+
+class IncrementalGoldBuilder:
+    """Scores only new or changed resume x req pairs and re-ranks only the REQ_IDs they touch
+
+    The whole table is built once, when no state file exists yet. Changes are found
+    by EXTRACTION_TIMESTAMP, so rows deleted from the source tables (and rows whose
+    timestamp is NULL) are not propagated to gold; rebuild from scratch (delete the
+    state file) after removing resumes or reqs.
+    """
+
+    def __init__(self, source, embedder=None, state_path=DEFAULT_STATE_PATH, top_k=None, store_dir=None):
+        self.source = source
+        self.embedder = embedder or HashingEmbedder()
+        self.state_path = state_path
+        self.top_k = top_k
+        # Embedding stores (see embedding_store.py); resumes and reqs whose text is unchanged are not re-embedded
+        self.store_dir = store_dir
+
+    def _changed(self, table, watermark):
+        if watermark is None:
+            return self.source.sql(f"SELECT * FROM {table}")
+        if watermark == EMPTY_WATERMARK:
+            # Every timestamped row is newer; no comparison, so the column's timestamp type does not matter
+            return self.source.sql(f"SELECT * FROM {table} WHERE EXTRACTION_TIMESTAMP IS NOT NULL")
+        return self.source.sql(f"SELECT * FROM {table} WHERE EXTRACTION_TIMESTAMP > ?",
+                               params=[watermark.to_pydatetime()])
+
+    def run(self):
+        """Apply one incremental step; returns a summary of what was recomputed"""
+        watermarks = load_watermarks(self.state_path)
+        changed_resumes = self._changed(RESUME_TABLE, watermarks['resumes'])
+        changed_reqs = self._changed(JOBREQ_TABLE, watermarks['reqs'])
+        summary = {'changed_resumes': len(changed_resumes), 'changed_reqs': len(changed_reqs),
+                   'full_reqs': 0, 'merged_reqs': 0, 'scored_pairs': 0}
+
+        if not watermarks['initialized']:
+            # First run: nothing to merge into, build the whole table
+            gold = score_gold(changed_resumes, changed_reqs, self.embedder, self.top_k, self.store_dir)
+            self.source.write_table(GOLD_TABLE, gold)
+            departments = seed_departments(self.source)
+            self.source.write_table(JOBS_DIM_TABLE, build_jobs_dimension(gold, departments),
+                                    variant_columns=JOBS_DIM_VARIANT_COLUMNS)
+            summary.update(full_reqs=gold['REQ_ID'].nunique(), scored_pairs=len(gold))
+        elif len(changed_resumes) or len(changed_reqs):
+            summary.update(self._merge(changed_resumes, changed_reqs))
+
+        watermarks['resumes'] = self._advance(watermarks['resumes'], changed_resumes)
+        watermarks['reqs'] = self._advance(watermarks['reqs'], changed_reqs)
+        save_watermarks(self.state_path, watermarks)
+        return summary
+
+    def _merge(self, changed_resumes, changed_reqs):
+        resume_ids = changed_resumes['RESUME_ID'].dropna().unique().tolist()
+        full_reqs = set(changed_reqs['REQ_ID'].dropna())
+
+        # Partitions touched by changed resumes: their new category plus wherever they were ranked before
+        previous = fetch_where_in(self.source, GOLD_TABLE, 'RESUME_ID', resume_ids, columns='REQ_ID, RESUME_ID, RANK_WITHIN_REQ')
+        touched = set(changed_resumes['CATEGORY'].dropna()) | set(previous['REQ_ID'].dropna())
+        if self.top_k is not None:
+            # A truncated partition that loses a ranked resume has no stored runner-up; rescore it fully
+            full_reqs |= set(previous['REQ_ID'].dropna())
+        merge_reqs = touched - full_reqs
+
+        frames = []
+        scored = 0
+        if full_reqs:
+            reqs = fetch_where_in(self.source, JOBREQ_TABLE, 'REQ_ID', sorted(full_reqs))
+            resumes = fetch_where_in(self.source, RESUME_TABLE, 'CATEGORY', sorted(full_reqs))
+            rescored = score_gold(resumes, reqs, self.embedder, self.top_k, self.store_dir)
+            frames.append(rescored)
+            scored += len(rescored)
+        if merge_reqs:
+            reqs = fetch_where_in(self.source, JOBREQ_TABLE, 'REQ_ID', sorted(merge_reqs))
+            fresh = changed_resumes[changed_resumes['CATEGORY'].isin(merge_reqs)]
+            new_pairs = score_gold(fresh, reqs, self.embedder, store_dir=self.store_dir)
+            scored += len(new_pairs)
+            existing = fetch_where_in(self.source, GOLD_TABLE, 'REQ_ID', sorted(merge_reqs))
+            existing = existing[~existing['RESUME_ID'].isin(resume_ids)]
+            frames.append(rerank_reqs(pd.concat([existing, new_pairs.reindex(columns=existing.columns)],
+                                                ignore_index=True), self.top_k))
+
+        affected = full_reqs | touched
+        merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=GOLD_COLUMNS)
+        self.source.replace_rows(GOLD_TABLE, 'REQ_ID', sorted(affected), merged.reindex(columns=GOLD_COLUMNS))
+        self._update_jobs_dimension(affected, merged)
+        return {'full_reqs': len(full_reqs), 'merged_reqs': len(merge_reqs), 'scored_pairs': scored}
+
+    def _update_jobs_dimension(self, affected, merged):
+        # merged holds every remaining row of the affected reqs, so their dimension rows can be rebuilt alone
+        try:
+            built = not self.source.sql(f"SELECT REQ_ID FROM {JOBS_DIM_TABLE} LIMIT 1").empty
+        except Exception:
+            built = False
+        if built:
+            dim = build_jobs_dimension(merged, read_departments(self.source))
+            self.source.replace_rows(JOBS_DIM_TABLE, 'REQ_ID', sorted(affected), dim,
+                                     variant_columns=JOBS_DIM_VARIANT_COLUMNS)
+        else:
+            # Gold table from before JOBS_DIM existed: build the dimension for every req once
+            rebuild_jobs_dimension(self.source)
+
+    @staticmethod
+    def _advance(watermark, changed):
+        # An empty table, or one without timestamps, still counts as built
+        watermark = EMPTY_WATERMARK if watermark is None else watermark
+        if changed.empty or 'EXTRACTION_TIMESTAMP' not in changed.columns:
+            return watermark
+        latest = pd.to_datetime(changed['EXTRACTION_TIMESTAMP']).max()
+        if pd.isna(latest):
+            return watermark
+        return latest if watermark == EMPTY_WATERMARK else max(watermark, latest)
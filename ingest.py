@@ -0,0 +1,214 @@
+"""Streaming job-listing ingester for JSON arrays and JSONL, with bounded memory per record"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from data_sources import BRONZE_JOBS_TABLE, SILVER_JOBS_TABLE, LocalSource
+
+READ_SIZE = 1 << 16
+# A single listing larger than this is quarantined instead of growing the buffer further
+MAX_RECORD_BYTES = 16 << 20
+
+_decoder = json.JSONDecoder()
+
+
+def _element_end(buf, pos):
+    """Index of the comma/bracket that ends the array element at pos, or None if buf ends first"""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(pos, len(buf)):
+        ch = buf[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            if depth == 0:
+                return i
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            return i
+    return None
+
+
+def _iter_array(f, buf):
+    """Yield (row_number, record, raw_text, error) for each element of a top-level JSON array"""
+    pos = buf.index('[') + 1
+    row = 0
+    eof = False
+    while True:
+        # Drop consumed text so the buffer only ever holds the current record plus one read
+        buf = buf[pos:]
+        pos = 0
+        while True:
+            stripped = buf.lstrip(' \t\r\n,')
+            if stripped or eof:
+                break
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buf += chunk
+        pos = len(buf) - len(stripped)
+        if not stripped or stripped[0] == ']':
+            return
+        try:
+            record, end = _decoder.raw_decode(buf, pos)
+        except ValueError as e:
+            end = _element_end(buf, pos)
+            if end is None and not eof and len(buf) - pos < MAX_RECORD_BYTES:
+                # Grow geometrically so a record spanning many reads is rescanned only O(log n) times
+                chunk = f.read(max(READ_SIZE, len(buf) - pos))
+                eof = not chunk
+                buf += chunk
+                continue
+            end = len(buf) if end is None else end
+            row += 1
+            yield row, None, buf[pos:end], str(e)
+            pos = end
+            continue
+        row += 1
+        yield row, record, None, None
+        pos = end
+        if len(buf) - pos < READ_SIZE and not eof:
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buf += chunk
+
+
+def _iter_lines(f, first):
+    """Yield (row_number, record, raw_text, error) for each non-blank JSONL line"""
+    row = 0
+    for line in _chain_first(first, f):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line), None, None
+        except ValueError as e:
+            yield row, None, line.rstrip('\n'), str(e)
+
+
+def _chain_first(first, f):
+    # The sniffed prefix may end mid-line; stitch it back onto the rest of that line
+    rest = f.readline()
+    yield first + rest
+    yield from f
+
+
+def iter_records(path):
+    """Stream (row_number, record, raw_text, error) from a JSON array or JSONL file"""
+    with open(path, encoding='utf-8') as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        if not head:
+            return
+        if head == '[':
+            yield from _iter_array(f, head)
+        else:
+            yield from _iter_lines(f, head)
+
+
+def flatten_listing(record, category=None):
+    """SILVER_JOB_LISTINGS_FLATTENED columns for one listing"""
+    return {
+        'CLASSIFED': None,
+        'CATEGORY': category,
+        'REQ_ID': _text(record.get('id')),
+        'JOB_ID': _text(record.get('id')),
+        'JOB_TITLE': record.get('title'),
+        'ORGANIZATION_NAME': record.get('organization'),
+        'ORGANIZATION_URL': record.get('organization_url'),
+        'DATE_POSTED': pd.to_datetime(record.get('date_posted'), errors='coerce'),
+        'DATE_CREATED': pd.to_datetime(record.get('date_created'), errors='coerce'),
+        'DATE_VALID_THROUGH': pd.to_datetime(record.get('date_validthrough'), errors='coerce'),
+        'JOB_DESCRIPTION': record.get('description_text', record.get('description')),
+    }
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+class JsonlQuarantine:
+    """Appends rejected records with their file metadata to a JSONL file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+
+    def add(self, filename, row_number, raw_text, error):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'FILENAME': filename, 'FILE_ROW_NUMBER': row_number,
+                                'ERROR': error, 'RAW_TEXT': raw_text[:10000]}) + '\n')
+        self.count += 1
+
+
+def ingest_file(path, source, batch_size=5000, category=None, quarantine=None, tables=('bronze', 'silver')):
+    """Load one feed file into the bronze and/or silver tables in fixed-size batches
+
+    Bad records are skipped and quarantined, like COPY INTO ... ON_ERROR = 'CONTINUE'.
+    """
+    filename = os.path.basename(path)
+    if category is None:
+        category = os.path.splitext(filename)[0]
+    stats = {'file': filename, 'rows': 0, 'rejected': 0, 'batches': 0}
+    bronze, silver = [], []
+
+    def flush():
+        ingested_at = pd.Timestamp.now(tz='UTC')
+        if 'bronze' in tables and bronze:
+            frame = pd.DataFrame(bronze, columns=['FILENAME', 'FILE_ROW_NUMBER', 'RAW_JSON'])
+            frame.insert(2, 'INGESTION_TIMESTAMP', ingested_at)
+            source.append_rows(BRONZE_JOBS_TABLE, frame, variant_columns=('RAW_JSON',))
+        if 'silver' in tables and silver:
+            source.append_rows(SILVER_JOBS_TABLE, pd.DataFrame(silver))
+        stats['batches'] += 1
+        bronze.clear()
+        silver.clear()
+
+    for row_number, record, raw_text, error in iter_records(path):
+        if error is None and not isinstance(record, dict):
+            raw_text, error = json.dumps(record), 'listing is not a JSON object'
+        if error is not None:
+            stats['rejected'] += 1
+            if quarantine is not None:
+                quarantine.add(filename, row_number, raw_text, error)
+            continue
+        bronze.append((filename, row_number, json.dumps(record)))
+        silver.append(flatten_listing(record, category))
+        stats['rows'] += 1
+        if len(silver) >= batch_size:
+            flush()
+    if silver:
+        flush()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream job-listing JSON/JSONL files into the local replica")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--data-dir', required=True, help="local replica directory (see data_sources.LocalSource)")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--category', help="CATEGORY for every listing (default: file name without extension)")
+    parser.add_argument('--quarantine', default='rejected_listings.jsonl')
+    args = parser.parse_args(argv)
+
+    source = LocalSource(args.data_dir)
+    quarantine = JsonlQuarantine(args.quarantine)
+    for path in args.files:
+        stats = ingest_file(path, source, args.batch_size, args.category, quarantine)
+        print(f"{stats['file']}: {stats['rows']} rows in {stats['batches']} batches, {stats['rejected']} rejected")
+
+
+if __name__ == '__main__':
+    main()
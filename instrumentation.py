@@ -0,0 +1,142 @@
+"""Query, cache and render timings per rerun, with p50/p95 summaries and a JSONL trace sink"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+TRACE_FILE_ENV = "RESUME_MATCHER_TRACE_FILE"
+
+
+def query_hash(query):
+    """Short stable hash of a statement, ignoring whitespace differences (bind values are not part of it)"""
+    return hashlib.sha1(' '.join(query.split()).encode('utf-8')).hexdigest()[:12]
+
+
+def frame_bytes(frame, deep=False):
+    """In-memory size of a result frame; deep also counts string payloads, which walks every value"""
+    return int(frame.memory_usage(index=False, deep=deep).sum())
+
+
+class Tracer:
+    """Thread-safe ring buffer of timing events, optionally mirrored to a JSONL file
+
+    Events carry the id of the rerun that produced them; Streamlit runs each
+    session's script on its own thread, so the current rerun is thread-local.
+    Query result sizes are shallow (string payloads uncounted) unless deep_bytes
+    is set, which by default it is only when events go to a trace file.
+    """
+
+    def __init__(self, path=None, max_events=5000, deep_bytes=None):
+        self.path = path
+        self.deep_bytes = bool(path) if deep_bytes is None else deep_bytes
+        self.events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reruns = 0
+
+    @contextmanager
+    def rerun(self, label='app'):
+        """Tag events recorded on this thread with a new rerun id
+
+        A nested call (a fragment running inside a full app run) joins the outer rerun.
+        """
+        current = getattr(self._local, 'rerun', None)
+        if current is not None:
+            yield current
+            return
+        with self._lock:
+            self._reruns += 1
+            rerun_id = self._reruns
+        self._local.rerun = rerun_id
+        try:
+            with self.span('rerun', label):
+                yield rerun_id
+        finally:
+            self._local.rerun = None
+
+    @contextmanager
+    def span(self, kind, name, **fields):
+        """Time the block; the yielded dict can be updated with extra fields (rows, bytes, ...)"""
+        event = dict(fields)
+        started = time.perf_counter()
+        try:
+            yield event
+        except Exception as e:
+            event['error'] = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            event['ms'] = (time.perf_counter() - started) * 1000
+            self.record(kind, name, **event)
+
+    def cache(self, name, hit, **fields):
+        """Record a cache lookup outcome"""
+        self.record('cache', name, hit=bool(hit), **fields)
+
+    def record(self, kind, name, **fields):
+        event = {'ts': time.time(), 'rerun': getattr(self._local, 'rerun', None), 'kind': kind, 'name': name, **fields}
+        with self._lock:
+            self.events.append(event)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(event, default=str) + '\n')
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.events)
+
+    def summary(self):
+        """Per (kind, name): count, errors, p50/p95/max ms, rows, bytes and cache hit rate"""
+        groups = {}
+        for event in self.snapshot():
+            groups.setdefault((event['kind'], event['name']), []).append(event)
+        rows = []
+        for (kind, name), events in sorted(groups.items()):
+            timings = np.array([event['ms'] for event in events if 'ms' in event], dtype=float)
+            hits = [event['hit'] for event in events if 'hit' in event]
+            rows.append({
+                'kind': kind,
+                'name': name,
+                'count': len(events),
+                'errors': sum(1 for event in events if event.get('error')),
+                'p50_ms': float(np.percentile(timings, 50)) if len(timings) else None,
+                'p95_ms': float(np.percentile(timings, 95)) if len(timings) else None,
+                'max_ms': float(timings.max()) if len(timings) else None,
+                'rows': sum(event.get('rows', 0) for event in events),
+                'bytes': sum(event.get('bytes', 0) for event in events),
+                'hit_rate': sum(hits) / len(hits) if hits else None,
+            })
+        return rows
+
+    def to_jsonl(self):
+        """Every buffered event as JSON lines"""
+        return ''.join(json.dumps(event, default=str) + '\n' for event in self.snapshot())
+
+
+class TracedSource:
+    """Data source wrapper that records every sql() call (statement hash, wall time, rows, bytes)"""
+
+    def __init__(self, source, tracer):
+        self.source = source
+        self.tracer = tracer
+        self.name = source.name
+
+    def sql(self, query, params=None):
+        statement = ' '.join(query.split())
+        with self.tracer.span('query', query_hash(statement), source=self.name, statement=statement[:120]) as event:
+            result = self.source.sql(query, params=params)
+            event.update(rows=len(result), bytes=frame_bytes(result, self.tracer.deep_bytes))
+        return result
+
+    def __getattr__(self, name):
+        # table_version, write_table, ... pass straight through
+        return getattr(self.source, name)
+
+
+def open_default_tracer():
+    """Tracer that also appends to $RESUME_MATCHER_TRACE_FILE when it is set"""
+    return Tracer(os.environ.get(TRACE_FILE_ENV) or None)
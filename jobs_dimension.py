@@ -0,0 +1,227 @@
+"""JOBS_DIM: one row per REQ_ID with department, parsed skills and candidate count, and the app's job list built from it"""
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from data_sources import DEPARTMENTS_TABLE, GOLD_TABLE, JOBS_DIM_TABLE, TABLE_SCHEMAS
+
+# Department names for raw CATEGORY values, for local builds: seed_departments() writes them to
+# DEPARTMENTS. Mirrors the MERGE that seeds DEPARTMENTS in "05 - Load into Gold layer.sql"; keep
+# the two in step. The app reads the mapping back from JOBS_DIM (CATEGORY -> DEPARTMENT), not from here.
+DEPARTMENT_NAMES = {
+    'MECHANICALCHEMICALQUALITYENGINEERING': 'Core_Engg',
+    'IT': 'Engineering',
+}
+
+JOBS_DIM_COLUMNS = [column for column, _ in TABLE_SCHEMAS[JOBS_DIM_TABLE]]
+# Carried as JSON text in frames; PARSE_JSON'd into the VARIANT column on Snowflake writes
+JOBS_DIM_VARIANT_COLUMNS = ('SKILLS',)
+
+JOBS_DIM_QUERY = f"SELECT {', '.join(JOBS_DIM_COLUMNS)} FROM {JOBS_DIM_TABLE} ORDER BY REQ_ID"
+
+# Per-req columns of the gold table, for replicas built before JOBS_DIM existed
+GOLD_JOB_COLUMNS_QUERY = f"SELECT REQ_ID, JOB_TITLE, CATEGORY, REQ_TECH_SKILLS FROM {GOLD_TABLE} WHERE REQ_ID IS NOT NULL"
+
+DEFAULT_REQUIRED_SKILLS = '["Skills vary by position"]'
+
+# Skill tags shown on an expanded job card
+JOB_SKILLS_SHOWN = 3
+
+
+def department_name(category, names=None):
+    """Map a raw CATEGORY value to its display department"""
+    return (DEPARTMENT_NAMES if names is None else names).get(category, category)
+
+
+def department_titles(titles, names=None):
+    """Titles with raw CATEGORY words replaced by their department names ({CATEGORY: DEPARTMENT})
+
+    >>> department_titles(pd.Series(['IT Support (REQ1)', 'Suite Manager (REQ2)'])).tolist()
+    ['Engineering Support (REQ1)', 'Suite Manager (REQ2)']
+    """
+    names = DEPARTMENT_NAMES if names is None else names
+    titles = titles.astype(str)
+    if not names:
+        return titles
+    # Whole words only, longest category first
+    pattern = re.compile(r'\b(' + '|'.join(
+        re.escape(category) for category in sorted(names, key=len, reverse=True)) + r')\b')
+    return titles.str.replace(pattern, lambda match: names[match.group(1)], regex=True)
+
+
+def dimension_departments(dim):
+    """{CATEGORY: DEPARTMENT} as JOBS_DIM applied it, for categories that were renamed"""
+    pairs = dim[['CATEGORY', 'DEPARTMENT']].dropna().drop_duplicates('CATEGORY')
+    pairs = pairs[pairs['CATEGORY'] != pairs['DEPARTMENT']]
+    return dict(zip(pairs['CATEGORY'].astype(str), pairs['DEPARTMENT'].astype(str)))
+
+
+def seed_departments(source):
+    """Upsert DEPARTMENT_NAMES into the DEPARTMENTS mapping table, as the 05 script's MERGE does"""
+    columns = [column for column, _ in TABLE_SCHEMAS[DEPARTMENTS_TABLE]]
+    frame = pd.DataFrame(list(DEPARTMENT_NAMES.items()), columns=columns)
+    source.replace_rows(DEPARTMENTS_TABLE, 'CATEGORY', list(DEPARTMENT_NAMES), frame)
+    return read_departments(source)
+
+
+def read_departments(source):
+    """{CATEGORY: DEPARTMENT} from the DEPARTMENTS table; DEPARTMENT_NAMES if it cannot be read or is empty"""
+    try:
+        frame = source.sql(f"SELECT CATEGORY, DEPARTMENT FROM {DEPARTMENTS_TABLE}")
+    except Exception:
+        return dict(DEPARTMENT_NAMES)
+    frame = frame.dropna()
+    if frame.empty:
+        return dict(DEPARTMENT_NAMES)
+    return dict(zip(frame['CATEGORY'].astype(str), frame['DEPARTMENT'].astype(str)))
+    return frame
+
+
+def parse_skills(value):
+    """Skills from REQUIRED_SKILLS (JSON array or comma-separated text), or None if unparseable"""
+    try:
+        if value.startswith('['):
+            skills = json.loads(value)
+        else:
+            skills = [skill.strip() for skill in str(value).split(',')]
+        return [skill for skill in skills if skill]
+    except Exception:
+        return None
+
+
+def load_skills(values):
+    """Lists from the JSON text of a SKILLS column (None for NULL), with one json.loads for the whole column"""
+    texts = [value if isinstance(value, str) else 'null' for value in values]
+    try:
+        return json.loads('[' + ','.join(texts) + ']')
+    except ValueError:
+        loaded = []
+        for text in texts:
+            try:
+                loaded.append(json.loads(text))
+            except ValueError:
+                loaded.append(None)
+        return loaded
+
+
+def build_jobs_dimension(gold, departments=None):
+    """JOBS_DIM rows from gold table rows; every row of a req must be present for its count to be right
+
+    departments ({CATEGORY: DEPARTMENT}) is normally read_departments(); DEPARTMENT_NAMES by default.
+    """
+    rows = gold[gold['REQ_ID'].notna()]
+    counts = rows.groupby('REQ_ID', sort=True).size()
+    reqs = rows.drop_duplicates('REQ_ID').set_index('REQ_ID').reindex(counts.index)
+    skills = [parse_skills(value) for value in reqs['REQ_TECH_SKILLS']]
+    return pd.DataFrame({
+        'REQ_ID': counts.index.to_numpy(dtype=object),
+        'JOB_TITLE': reqs['JOB_TITLE'].to_numpy(dtype=object),
+        'CATEGORY': reqs['CATEGORY'].to_numpy(dtype=object),
+        'DEPARTMENT': reqs['CATEGORY'].map(lambda category: department_name(category, departments))
+                                      .to_numpy(dtype=object),
+        'REQ_TECH_SKILLS': reqs['REQ_TECH_SKILLS'].to_numpy(dtype=object),
+        'SKILLS': np.array([json.dumps(parsed) if parsed is not None else None for parsed in skills], dtype=object),
+        'CANDIDATE_COUNT': counts.to_numpy(dtype=np.int64),
+    }, columns=JOBS_DIM_COLUMNS)
+
+
+def rebuild_jobs_dimension(source):
+    """Rewrite JOBS_DIM (and the DEPARTMENTS mapping) from the whole gold table"""
+    departments = seed_departments(source)
+    dim = build_jobs_dimension(source.sql(GOLD_JOB_COLUMNS_QUERY), departments)
+    source.write_table(JOBS_DIM_TABLE, dim, variant_columns=JOBS_DIM_VARIANT_COLUMNS)
+    return dim
+
+
+def read_jobs_dimension(source):
+    """JOBS_DIM, or the same rows derived from the gold table when the dimension has not been built yet"""
+    try:
+        dim = source.sql(JOBS_DIM_QUERY)
+    except Exception:
+        dim = None
+    if dim is None or dim.empty:
+        dim = build_jobs_dimension(source.sql(GOLD_JOB_COLUMNS_QUERY), read_departments(source))
+    return dim
+
+
+def skills_html(skills):
+    """Skill tags for the first few skills"""
+    if skills is None:
+        return '<span class="skill-tag">Skills not available</span>'
+    return ''.join(f'<span class="skill-tag">{skill}</span>' for skill in skills[:JOB_SKILLS_SHOWN])
+
+
+def prepare_jobs(jobs, departments=None):
+    """Add the display columns the job list renders, so they are computed once per load instead of per rerun
+
+    departments ({CATEGORY: DEPARTMENT}) renames categories in titles; DEPARTMENT_NAMES by default.
+    """
+    jobs = jobs.copy()
+    if 'SKILLS' not in jobs.columns:
+        jobs['SKILLS'] = [parse_skills(value) for value in jobs['REQUIRED_SKILLS']]
+    jobs['SKILLS_HTML'] = [skills_html(parsed) for parsed in jobs['SKILLS']]
+    jobs['DISPLAY_TITLE'] = department_titles(jobs['TITLE'], departments)
+    jobs['SEARCH_TEXT'] = (jobs['DISPLAY_TITLE'] + ' ' + jobs['DEPARTMENT'].fillna('').astype(str) + ' '
+                           + jobs['REQUIRED_SKILLS'].fillna('').astype(str)).str.lower()
+    return jobs
+
+
+def search_jobs(jobs, text):
+    """Jobs whose title, department or skills contain every word of text (case-insensitive)"""
+    terms = (text or '').lower().split()
+    if not terms or jobs.empty:
+        return jobs
+    mask = np.ones(len(jobs), dtype=bool)
+    for term in terms:
+        mask &= jobs['SEARCH_TEXT'].str.contains(term, regex=False).to_numpy(dtype=bool)
+    return jobs[mask]
+
+
+class JobDirectory:
+    """Job list, department list and per-department index, all from one read of JOBS_DIM"""
+
+    def __init__(self, dim):
+        titled = dim[dim['JOB_TITLE'].notna()]
+        label = titled['JOB_TITLE'] + ' (' + titled['REQ_ID'] + ')'
+        skills = load_skills(titled['SKILLS'])
+        # A req without skills lists the placeholder, as the gold queries always did
+        default_skills = parse_skills(DEFAULT_REQUIRED_SKILLS)
+        skills = [default_skills if pd.isna(raw) else parsed
+                  for raw, parsed in zip(titled['REQ_TECH_SKILLS'], skills)]
+        self.jobs = prepare_jobs(pd.DataFrame({
+            'JOB_ID': titled['REQ_ID'],
+            'JOB_TITLE': titled['JOB_TITLE'],
+            'TITLE': label,
+            'DEPARTMENT': titled['DEPARTMENT'],
+            'DESCRIPTION': 'Job requirements and details for ' + label,
+            'REQUIRED_SKILLS': titled['REQ_TECH_SKILLS'].fillna(DEFAULT_REQUIRED_SKILLS),
+            'SKILLS': skills,
+            'CANDIDATE_COUNT': titled['CANDIDATE_COUNT'],
+        }).sort_values(['JOB_ID', 'JOB_TITLE'], kind='stable').reset_index(drop=True),
+            # Titles use the same mapping as the department filter, whichever build wrote JOBS_DIM
+            dimension_departments(dim))
+
+        self.jobs_original = pd.DataFrame({
+            'JOB_ID': dim['REQ_ID'],
+            'TITLE': dim['JOB_TITLE'] + ' (' + dim['REQ_ID'] + ')',
+            'DEPARTMENT': dim['CATEGORY'],
+            'DESCRIPTION': 'Job requirements and details for ' + dim['JOB_TITLE'] + ' (' + dim['REQ_ID'] + ')',
+            'REQUIRED_SKILLS': DEFAULT_REQUIRED_SKILLS,
+        }).reset_index(drop=True)
+
+        # Department -> jobs in that department
+        self.category_jobs = {
+            department: frame
+            for department, frame in self.jobs.groupby('DEPARTMENT', sort=True)
+        }
+        self.categories = sorted(dim['DEPARTMENT'].dropna().unique().tolist())
+
+    def jobs_for(self, category, search=''):
+        """Jobs for a department (or every job for 'All'), narrowed by a text search"""
+        if category == 'All':
+            jobs = self.jobs
+        else:
+            jobs = self.category_jobs.get(category, self.jobs.iloc[0:0])
+        return search_jobs(jobs, search)
@@ -0,0 +1,194 @@
+"""Resume links generated on demand for rendered cards, cached per FILE_PATH until shortly before they expire"""
+import functools
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from data_sources import chunked
+
+RESUME_LINK_STAGE = '@HACKATHON_2025.JOE.REQS_RESUMES'
+# Seconds a presigned URL stays valid (GET_PRESIGNED_URL's own default)
+LINK_EXPIRY = 3600
+# Links this close to expiring are generated again rather than handed out
+REFRESH_MARGIN = 300
+# Paths per GET_PRESIGNED_URL query
+LINK_BATCH_SIZE = 500
+
+RESUME_DIR_ENV = 'RESUME_MATCHER_RESUME_DIR'
+DEFAULT_RESUME_DIR = 'Resumes'
+
+
+class StageLinkProvider:
+    """Presigned URLs for files on the resume stage, a batch of paths per query"""
+
+    def __init__(self, source, stage=RESUME_LINK_STAGE, expiry=LINK_EXPIRY, batch_size=LINK_BATCH_SIZE):
+        self.source = source
+        self.stage = stage
+        self.expiry = expiry
+        self.batch_size = batch_size
+
+    def links(self, paths):
+        """{FILE_PATH: URL} for stage-relative paths"""
+        links = {}
+        for batch in chunked(list(paths), self.batch_size):
+            result = self.source.sql(f"""
+            SELECT f.value::STRING AS FILE_PATH,
+                   GET_PRESIGNED_URL('{self.stage}', f.value::STRING, {int(self.expiry)}) AS URL
+            FROM TABLE(FLATTEN(INPUT => PARSE_JSON(?))) f
+            """, params=[json.dumps(list(batch))])
+            links.update(zip(result['FILE_PATH'], result['URL']))
+        return links
+
+
+class _ResumeFileHandler(SimpleHTTPRequestHandler):
+    """Serves a file only for a link the provider issued and that has not expired; no directory listings"""
+
+    def __init__(self, *args, provider, **kwargs):
+        self.provider = provider
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self._authorized():
+            super().do_GET()
+
+    def do_HEAD(self):
+        if self._authorized():
+            super().do_HEAD()
+
+    def _authorized(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        path = unquote(url.path).lstrip('/')
+        if self.provider.verify(path, (query.get('expires') or [''])[0], (query.get('sig') or [''])[0]):
+            return True
+        self.send_error(HTTPStatus.NOT_FOUND)
+        return False
+
+    def list_directory(self, path):
+        self.send_error(HTTPStatus.NOT_FOUND)
+        return None
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalLinkProvider:
+    """Offline stand-in: serves resume files over HTTP on localhost behind signed links that expire
+
+    Only paths handed out by links() are served, and only until their expires
+    parameter passes; the signing key lives and dies with the provider.
+    """
+
+    def __init__(self, root=DEFAULT_RESUME_DIR, host='127.0.0.1', port=0, expiry=LINK_EXPIRY):
+        self.root = os.path.abspath(root)
+        self.host = host
+        self.port = port
+        self.expiry = expiry
+        self._key = secrets.token_bytes(32)
+        self._known = set()
+        self._server = None
+        self._lock = threading.Lock()
+
+    def links(self, paths):
+        base = self.start()
+        expires = int(time.time()) + int(self.expiry)
+        links = {}
+        for path in paths:
+            relative = str(path).lstrip('/')
+            with self._lock:
+                self._known.add(relative)
+            links[path] = f'{base}/{quote(relative)}?expires={expires}&sig={self._sign(relative, expires)}'
+        return links
+
+    def verify(self, path, expires, signature):
+        """True for a path links() issued, with an unexpired expires and its matching signature"""
+        try:
+            expires = int(expires)
+        except ValueError:
+            return False
+        with self._lock:
+            known = path in self._known
+        return known and expires > time.time() and hmac.compare_digest(self._sign(path, expires), signature)
+
+    def _sign(self, path, expires):
+        return hmac.new(self._key, f'{path}|{expires}'.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def start(self):
+        """Base URL of the file server, starting it on first use"""
+        with self._lock:
+            if self._server is None:
+                handler = functools.partial(_ResumeFileHandler, directory=self.root, provider=self)
+                self._server = ThreadingHTTPServer((self.host, self.port), handler)
+                threading.Thread(target=self._server.serve_forever, name='resume-files', daemon=True).start()
+        return f'http://{self.host}:{self._server.server_address[1]}'
+
+    def stop(self):
+        with self._lock:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+
+
+def open_link_provider(source):
+    """Stage links on Snowflake, the local file server for a replica whose resume directory exists, else None"""
+    if source is None:
+        return None
+    if source.name == 'snowflake':
+        return StageLinkProvider(source)
+    root = os.environ.get(RESUME_DIR_ENV) or DEFAULT_RESUME_DIR
+    return LocalLinkProvider(root) if os.path.isdir(root) else None
+
+
+class LinkCache:
+    """Process-wide {FILE_PATH: (URL, expires at)}, filled a batch at a time from a link provider
+
+    Entries within refresh_margin seconds of expiring count as missing, so a link
+    handed to a card is always valid for at least that long. The least recently
+    used entries are dropped past max_entries.
+    """
+
+    def __init__(self, provider, refresh_margin=REFRESH_MARGIN, max_entries=20000):
+        self.provider = provider
+        self.refresh_margin = refresh_margin
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def links(self, paths):
+        """({FILE_PATH: URL} for paths, number generated); every missing or expiring link comes from one provider call"""
+        paths = [path for path in dict.fromkeys(paths) if isinstance(path, str) and path]
+        now = time.time()
+        links, missing = {}, []
+        with self._lock:
+            for path in paths:
+                entry = self._cache.get(path)
+                if entry is not None and (entry[1] is None or entry[1] - now > self.refresh_margin):
+                    self._cache.move_to_end(path)
+                    links[path] = entry[0]
+                else:
+                    missing.append(path)
+        if missing:
+            fresh = self.provider.links(missing)
+            expiry = getattr(self.provider, 'expiry', None)
+            expires_at = now + expiry if expiry else None
+            with self._lock:
+                for path, url in fresh.items():
+                    self._cache[path] = (url, expires_at)
+                    self._cache.move_to_end(path)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            links.update(fresh)
+        return links, len(missing)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
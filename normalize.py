@@ -0,0 +1,246 @@
+"""Column-wise normalizer for raw AI_EXTRACT responses (Step 2 of the extract scripts)
+
+Golden cases below mirror the CASE chains in "03 - Extract Raw Data.sql" and
+"04 - Extract Resume.sql"; run them with `python normalize.py`.
+"""
+import json
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from data_sources import JOBREQ_TABLE, RESUME_TABLE, TABLE_SCHEMAS
+
+TRUE_STRINGS = ('true', 'yes', '1')
+ZERO_YEARS_STRINGS = ('none', 'no experience', 'n/a', 'null', '0')
+# Snowflake REGEXP_LIKE matches the whole string and \d is ASCII-only
+YEARS_PATTERN = r'[0-9]+\+?'
+# Longer digit runs do not fit an int64 (and are not a plausible count of years); they map to 0
+MAX_YEARS_DIGITS = 18
+
+# Output column -> response key, per table
+RESUME_TEXT_FIELDS = {
+    'MOST_RECENT_JOB_TITLE': 'job_1',
+    'TECHNICAL_SKILLS': 'technical_skills',
+    'ADDITIONAL_SKILLS': 'additional_skills',
+    'CERTIFICATIONS': 'certifications',
+    'JOB_TITLES_LIST': 'job_titles_list',
+    'PROGRAMMING_LANGUAGES': 'programming_languages',
+    'COLLEGE_SPORTS': 'college_sports',
+    'COLLEGE_SPORTS_DIVISION': 'college_sports_division',
+    'PERSONAL_INTERESTS': 'personal_interests',
+    'INTERESTING': 'Interesting',
+}
+RESUME_FLAG_FIELDS = {
+    'COMMUNITY_VOLUNTEER_BOOL': 'community_volunteer_bool',
+    'SPOKEN_LANGUAGES_BOOL': 'spoken_languages_bool',
+    'LEADERSHIP_EXPERIENCE_BOOL': 'leadership_experience_bool',
+    'HAS_DOCTORATE': 'has_doctorate',
+    'HAS_MASTERS': 'has_masters',
+    'HAS_BACHELORS': 'has_bachelors',
+}
+# Output column -> (response key, flag column that must be TRUE for the value to be kept)
+RESUME_GATED_FIELDS = {
+    'COMMUNITY_VOLUNTEER': ('community_volunteer', 'COMMUNITY_VOLUNTEER_BOOL'),
+    'SPOKEN_LANGUAGES': ('spoken_languages', 'SPOKEN_LANGUAGES_BOOL'),
+    'LEADERSHIP_EXPERIENCE': ('leadership_experience', 'LEADERSHIP_EXPERIENCE_BOOL'),
+    'DOCTORATE_NAME': ('doctorate_name', 'HAS_DOCTORATE'),
+    'MASTERS_NAME': ('masters_name', 'HAS_MASTERS'),
+    'BACHELORS_NAME': ('bachelors_name', 'HAS_BACHELORS'),
+}
+
+JOBREQ_TEXT_FIELDS = {
+    'JOB_TITLE': 'job_1',
+    'TECHNICAL_SKILLS_REQUIRED': 'technical_skills',
+    'ADDITIONAL_SKILLS_REQUIRED': 'additional_skills',
+    'CERTIFICATIONS_REQUIRED': 'certifications',
+    'JOB_TITLES_LIST': 'job_titles_list',
+    'PROGRAMMING_LANGUAGES_REQUIRED': 'programming_languages',
+}
+JOBREQ_FLAG_FIELDS = {
+    'REQUIRES_NON_ENGLISH_LANGUAGES': 'spoken_languages_bool',
+    'REQUIRES_LEADERSHIP_EXPERIENCE': 'leadership_experience_bool',
+    'REQUIRES_DOCTORATE': 'has_doctorate',
+    'REQUIRES_MASTERS': 'has_masters',
+    'REQUIRES_BACHELORS': 'has_bachelors',
+}
+JOBREQ_GATED_FIELDS = {
+    'SPOKEN_LANGUAGES_REQUIRED': ('spoken_languages', 'REQUIRES_NON_ENGLISH_LANGUAGES'),
+    'LEADERSHIP_EXPERIENCE_DETAILS': ('leadership_experience', 'REQUIRES_LEADERSHIP_EXPERIENCE'),
+    'REQUIRED_DOCTORATE_FIELD': ('doctorate_name', 'REQUIRES_DOCTORATE'),
+    'REQUIRED_MASTERS_FIELD': ('masters_name', 'REQUIRES_MASTERS'),
+    'REQUIRED_BACHELORS_FIELD': ('bachelors_name', 'REQUIRES_BACHELORS'),
+}
+
+
+def _variant_string(value):
+    """VARIANT::STRING for a non-string JSON value"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+    return str(value)
+
+
+def as_strings(values):
+    """Object Series of strings/None, with non-string JSON values cast like VARIANT::STRING
+
+    >>> as_strings(pd.Series(['a', None, True, 3, 2.0, ['x', 'y'], float('nan')])).tolist()
+    ['a', None, 'true', '3', '2', '["x","y"]', None]
+    """
+    values = np.asarray(values, dtype=object)
+    missing = pd.isna(values)
+    # infer_dtype is a single C pass; the per-value cast only runs for batches holding non-strings
+    if pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty'):
+        values = np.array([value if isinstance(value, str) or value is None else _variant_string(value)
+                           for value in values], dtype=object)
+    if missing.any():
+        values = values.copy()
+        values[missing] = None
+    return pd.Series(values, dtype=object)
+
+
+def parse_responses(extracted, keys):
+    """Frame of extracted_info:response:<key>::STRING for each raw EXTRACTED_INFO value (dict or JSON text)"""
+    extracted = list(extracted)
+    texts = [info for info in extracted if isinstance(info, str)]
+    if texts:
+        try:
+            # One decoder call for the whole batch instead of one per row
+            decoded = iter(json.loads('[' + ','.join(text or 'null' for text in texts) + ']'))
+        except ValueError:
+            decoded = iter(json.loads(text) if text else None for text in texts)
+        extracted = [next(decoded) if isinstance(info, str) else info for info in extracted]
+    responses = []
+    for info in extracted:
+        response = info.get('response') if isinstance(info, dict) else None
+        responses.append(response if isinstance(response, dict) else {})
+    return pd.DataFrame({key: as_strings(list(map(dict.get, responses, repeat(key)))) for key in keys},
+                        index=pd.RangeIndex(len(responses)))
+
+
+def truthy(values):
+    """LOWER(x) IN ('true', 'yes', '1'); NULL is FALSE
+
+    >>> truthy(pd.Series(['TRUE', 'Yes', '1', 'false', ' true', None, 'y'])).tolist()
+    [True, True, True, False, False, False, False]
+    """
+    values = pd.Series(values, dtype=object)
+    return values.str.lower().isin(TRUE_STRINGS).to_numpy(dtype=bool)
+
+
+def years_of_experience(values):
+    """The years_of_experience CASE chain: bare digits with an optional trailing '+', else 0
+
+    >>> years_of_experience(pd.Series(['5', '10+', ' 7 ', 'None', 'N/A', '0', '3 years', '2-4', None, '٣'])).tolist()
+    [5, 10, 0, 0, 0, 0, 0, 0, 0, 0]
+    >>> years_of_experience(pd.Series(['12345678901234567890123', '007+'])).tolist()
+    [0, 7]
+    """
+    values = pd.Series(values, dtype=object)
+    zero = values.str.strip().str.lower().isin(ZERO_YEARS_STRINGS).to_numpy(dtype=bool)
+    digits = values.str.fullmatch(YEARS_PATTERN).fillna(False).to_numpy(dtype=bool) & ~zero
+    years = np.zeros(len(values), dtype=np.int64)
+    if digits.any():
+        numbers = values[digits].str.replace('+', '', regex=False).str.lstrip('0')
+        fits = (numbers.str.len() <= MAX_YEARS_DIGITS).to_numpy(dtype=bool)
+        rows = np.flatnonzero(digits)[fits]
+        years[rows] = pd.to_numeric(numbers[fits].replace('', '0')).astype(np.int64).to_numpy()
+    return years
+
+
+def _flatten(extracted, years_column, text_fields, flag_fields, gated_fields, degree_flags, high_school_column):
+    keys = {'years_of_experience', 'has_high_school', *text_fields.values(), *flag_fields.values()}
+    keys |= {key for key, _ in gated_fields.values()}
+    response = parse_responses(extracted, sorted(keys))
+
+    columns = {years_column: years_of_experience(response['years_of_experience'])}
+    columns.update({column: response[key] for column, key in text_fields.items()})
+    columns.update({column: truthy(response[key]) for column, key in flag_fields.items()})
+    # High school is implied by any higher degree
+    higher = np.logical_or.reduce([columns[column] for column in degree_flags])
+    columns[high_school_column] = higher | truthy(response['has_high_school'])
+    for column, (key, flag) in gated_fields.items():
+        columns[column] = response[key].where(columns[flag], None)
+    return columns
+
+
+def _full_json(extracted):
+    return pd.Series([value if isinstance(value, str) or value is None else json.dumps(value) for value in extracted],
+                     dtype=object)
+
+
+def _table_columns(table):
+    # Vector columns are added by the embedding step, not by the flatten
+    return [column for column, _ in TABLE_SCHEMAS[table] if not column.startswith('VECTOR_')]
+
+
+def normalize_resumes(raw):
+    """FLATTENED_RESUME_PDFS from RESUME_PDF_EXTRACTIONS-shaped rows
+
+    raw needs RELATIVE_PATH, FILE_URL, EXTRACTION_TIMESTAMP, CATEGORY, RESUME_ID and EXTRACTED_INFO.
+
+    >>> raw = pd.DataFrame({'RELATIVE_PATH': ['IT/2.pdf', 'HR/1.pdf'], 'FILE_URL': ['u2', 'u1'],
+    ...                     'EXTRACTION_TIMESTAMP': [None, None], 'CATEGORY': ['IT', 'HR'], 'RESUME_ID': ['2.pdf', '1.pdf'],
+    ...                     'EXTRACTED_INFO': [{'response': {'job_1': 'Dev', 'years_of_experience': '4+', 'has_masters': 'Yes',
+    ...                                                      'masters_name': 'MSc', 'bachelors_name': 'BSc',
+    ...                                                      'spoken_languages_bool': 'false', 'spoken_languages': 'French'}},
+    ...                                        '{"response": {"has_high_school": "true", "technical_skills": ["SQL", "Excel"]}}']})
+    >>> flat = normalize_resumes(raw)
+    >>> flat[['FILE_PATH', 'MOST_RECENT_JOB_TITLE', 'YEARS_OF_EXPERIENCE', 'TECHNICAL_SKILLS']].values.tolist()
+    [['HR/1.pdf', None, 0, '["SQL","Excel"]'], ['IT/2.pdf', 'Dev', 4, None]]
+    >>> flat[['HAS_MASTERS', 'HAS_HIGH_SCHOOL_DIPLOMA', 'MASTERS_NAME', 'BACHELORS_NAME', 'SPOKEN_LANGUAGES']].values.tolist()
+    [[False, True, None, None, None], [True, True, 'MSc', None, None]]
+    """
+    extracted = raw['EXTRACTED_INFO'].tolist()
+    columns = _flatten(extracted, 'YEARS_OF_EXPERIENCE',
+                       RESUME_TEXT_FIELDS, RESUME_FLAG_FIELDS, RESUME_GATED_FIELDS,
+                       ('HAS_DOCTORATE', 'HAS_MASTERS', 'HAS_BACHELORS'), 'HAS_HIGH_SCHOOL_DIPLOMA')
+    flat = pd.DataFrame({
+        'FILE_PATH': raw['RELATIVE_PATH'].reset_index(drop=True),
+        'RESUME_ID': raw['RESUME_ID'].reset_index(drop=True),
+        'FILE_URL': raw['FILE_URL'].reset_index(drop=True),
+        'EXTRACTION_TIMESTAMP': raw['EXTRACTION_TIMESTAMP'].reset_index(drop=True),
+        'CATEGORY': raw['CATEGORY'].reset_index(drop=True),
+        **columns,
+        'FULL_EXTRACTED_JSON': _full_json(extracted),
+    })
+    flat = flat.sort_values('FILE_PATH', kind='stable').reset_index(drop=True)
+    return flat[_table_columns(RESUME_TABLE)]
+
+
+def normalize_jobreqs(raw):
+    """JOBREQ_FLATTENED from JOBREQ_EXTRACTIONS-shaped rows (EXTRACTION_TIMESTAMP, REQ_ID, CATEGORY, EXTRACTED_INFO)
+
+    >>> raw = pd.DataFrame({'EXTRACTION_TIMESTAMP': [None], 'REQ_ID': ['r1'], 'CATEGORY': ['IT'],
+    ...                     'EXTRACTED_INFO': [{'response': {'job_1': 'Engineer', 'years_of_experience': '5 years',
+    ...                                                      'has_doctorate': True, 'doctorate_name': 'PhD',
+    ...                                                      'leadership_experience_bool': 'no',
+    ...                                                      'leadership_experience': 'Team lead'}}]})
+    >>> flat = normalize_jobreqs(raw)
+    >>> flat[['JOB_TITLE', 'YEARS_OF_EXPERIENCE_REQUIRED', 'REQUIRES_DOCTORATE', 'REQUIRES_HIGH_SCHOOL_DIPLOMA']].values.tolist()
+    [['Engineer', 0, True, True]]
+    >>> flat[['REQUIRED_DOCTORATE_FIELD', 'REQUIRES_LEADERSHIP_EXPERIENCE', 'LEADERSHIP_EXPERIENCE_DETAILS']].values.tolist()
+    [['PhD', False, None]]
+    """
+    extracted = raw['EXTRACTED_INFO'].tolist()
+    columns = _flatten(extracted, 'YEARS_OF_EXPERIENCE_REQUIRED',
+                       JOBREQ_TEXT_FIELDS, JOBREQ_FLAG_FIELDS, JOBREQ_GATED_FIELDS,
+                       ('REQUIRES_DOCTORATE', 'REQUIRES_MASTERS', 'REQUIRES_BACHELORS'), 'REQUIRES_HIGH_SCHOOL_DIPLOMA')
+    flat = pd.DataFrame({
+        'EXTRACTION_TIMESTAMP': raw['EXTRACTION_TIMESTAMP'].reset_index(drop=True),
+        'REQ_ID': raw['REQ_ID'].reset_index(drop=True),
+        'CATEGORY': raw['CATEGORY'].reset_index(drop=True),
+        **columns,
+        'FULL_EXTRACTED_JSON': _full_json(extracted),
+    })
+    return flat[_table_columns(JOBREQ_TABLE)]
+
+
+if __name__ == '__main__':
+    import doctest
+    failures, tests = doctest.testmod()
+    print(f"{tests - failures}/{tests} golden checks passed")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,122 @@
+"""Speculative, rate-limited background fetches into a bounded LRU cache"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+
+
+class Prefetcher:
+    """Runs fetch(key) ahead of need on a shared executor and keeps the newest results
+
+    At most max_in_flight fetches are queued or running at once, and fetches are
+    started from a token bucket (burst at once, refilled at rate per second);
+    keys over either limit are skipped rather than queued, so a burst of clicks
+    cannot flood the warehouse. Callers (app sessions) share one prefetcher, so
+    each prefetch() call names its scope: it withdraws only that scope's
+    interest in keys it no longer asks for, and a queued fetch is cancelled
+    once no scope wants it. get() waits at most timeout seconds for a fetch in
+    flight. Results older than max_age seconds are treated as missing.
+    """
+
+    def __init__(self, fetch, executor, max_entries=64, max_in_flight=2, rate=2.0, burst=4, max_age=60,
+                 timeout=2.0):
+        self.fetch = fetch
+        self.executor = executor
+        self.max_entries = max_entries
+        self.max_in_flight = max_in_flight
+        self.rate = rate
+        self.burst = burst
+        self.max_age = max_age
+        self.timeout = timeout
+        self._cache = OrderedDict()
+        self._pending = {}
+        # key -> scopes that asked for it in their latest prefetch() call
+        self._wanted = {}
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+
+    def prefetch(self, keys, scope=None):
+        """Start background fetches for keys (in priority order) on behalf of scope; returns the keys submitted"""
+        keys = list(dict.fromkeys(keys))
+        wanted = set(keys)
+        submitted = []
+        with self._lock:
+            for key, scopes in list(self._wanted.items()):
+                if key not in wanted:
+                    scopes.discard(scope)
+            self._cancel_unwanted()
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            for key in keys:
+                if key in self._pending:
+                    self._wanted.setdefault(key, set()).add(scope)
+                    continue
+                if self._fresh(key):
+                    continue
+                if len(self._pending) >= self.max_in_flight or self._tokens < 1:
+                    break
+                self._tokens -= 1
+                self._wanted.setdefault(key, set()).add(scope)
+                self._pending[key] = self.executor.submit(self._run, key)
+                submitted.append(key)
+        return submitted
+
+    def get(self, key, timeout=None):
+        """(hit, value): a cached result, or one still being fetched if it arrives within timeout
+
+        timeout defaults to the prefetcher's; a fetch that takes longer is a miss
+        (it keeps running and still fills the cache), so the caller fetches for itself.
+        """
+        with self._lock:
+            if self._fresh(key):
+                self._cache.move_to_end(key)
+                return True, self._cache[key][1]
+            future = self._pending.get(key)
+        if future is None:
+            return False, None
+        try:
+            return True, future.result(timeout=self.timeout if timeout is None else timeout)
+        except (CancelledError, Exception):
+            # A failed, cancelled or slow prefetch is just a miss
+            return False, None
+
+    def cancel(self, scope=None):
+        """Withdraw scope's interest in every key, cancelling fetches no one else wants that have not started"""
+        with self._lock:
+            for scopes in self._wanted.values():
+                scopes.discard(scope)
+            self._cancel_unwanted()
+
+    def clear(self):
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._wanted.clear()
+            self._cache.clear()
+
+    def _cancel_unwanted(self):
+        for key, future in list(self._pending.items()):
+            if not self._wanted.get(key) and future.cancel():
+                del self._pending[key]
+                self._wanted.pop(key, None)
+
+    def _fresh(self, key):
+        entry = self._cache.get(key)
+        return entry is not None and time.monotonic() - entry[0] <= self.max_age
+
+    def _run(self, key):
+        try:
+            value = self.fetch(key)
+            with self._lock:
+                self._cache[key] = (time.monotonic(), value)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+                self._wanted.pop(key, None)
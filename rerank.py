@@ -0,0 +1,63 @@
+"""In-process re-ranking of a req's candidates by a weighted mix of match, experience, degree and skill fit"""
+import numpy as np
+import pandas as pd
+
+# Factor weights used until a recruiter moves the sliders; experience and degree start switched off,
+# so the default order is the build-time MATCH_SCORE rank (blended with skills when skills are picked)
+DEFAULT_WEIGHTS = {'match': 0.7, 'experience': 0.0, 'degree': 0.0, 'skills': 0.3}
+
+# Flag columns -> degree level, highest first
+RESUME_DEGREE_FLAGS = [('HAS_DOCTORATE', 4), ('HAS_MASTERS', 3), ('HAS_BACHELORS', 2), ('HAS_HIGH_SCHOOL_DIPLOMA', 1)]
+REQ_DEGREE_FLAGS = [('REQUIRES_DOCTORATE', 4), ('REQUIRES_MASTERS', 3), ('REQUIRES_BACHELORS', 2),
+                    ('REQUIRES_HIGH_SCHOOL_DIPLOMA', 1)]
+
+
+def degree_levels(frame, flags):
+    """Highest flagged degree level per row (0 when none is flagged)"""
+    conditions = [frame[column].fillna(False).astype(bool).to_numpy() for column, _ in flags]
+    return np.select(conditions, [level for _, level in flags], default=0).astype(np.int8)
+
+
+def experience_fit(resume_yoe, required_yoe):
+    """1 when a resume meets the required years, falling linearly to 0 at none; 1 for every resume if none are required"""
+    resume_yoe = np.nan_to_num(np.asarray(resume_yoe, dtype=np.float64), nan=0.0)
+    if not required_yoe or np.isnan(required_yoe) or required_yoe <= 0:
+        return np.ones(len(resume_yoe))
+    return np.clip(resume_yoe / required_yoe, 0.0, 1.0)
+
+
+def degree_fit(levels, required_level):
+    """1 when the degree requirement is met, half credit per level short"""
+    levels = np.asarray(levels, dtype=np.float64)
+    if not required_level:
+        return np.ones(len(levels))
+    return np.clip(1.0 - 0.5 * (required_level - levels), 0.0, 1.0)
+
+
+def composite_scores(factors, weights=None):
+    """Weighted mean (0-100) of the factors (each 0-1) that have a positive weight; MATCH alone if none do"""
+    weights = weights or DEFAULT_WEIGHTS
+    used = [(weights.get(name, 0.0), values) for name, values in factors.items() if weights.get(name, 0.0) > 0]
+    if not used:
+        return 100 * np.asarray(factors['match'], dtype=np.float64)
+    total = sum(weight for weight, _ in used)
+    return 100 * sum(weight * np.asarray(values, dtype=np.float64) for weight, values in used) / total
+
+
+def rerank(candidates, factors, weights=None, mask=None, limit=None):
+    """(top limit candidates by composite score, number ranked), with RANK renumbered and the build rank in MATCH_RANK
+
+    Ties keep the build-time order. mask (optional) drops candidates before ranking.
+    Only the returned rows are materialized; the ranking itself is pure array work.
+    """
+    scores = composite_scores(factors, weights)
+    keep = np.flatnonzero(mask) if mask is not None else np.arange(len(candidates))
+    order = keep[np.argsort(-scores[keep], kind='stable')][:limit]
+    ranked = candidates.iloc[order]
+    # One concat for the new columns; inserting them one at a time costs more than the ranking itself
+    extra = {'MATCH_RANK': ranked['RANK'].to_numpy(), 'RANK': np.arange(1, len(order) + 1),
+             'SCORE': scores[order].round(1)}
+    for name, column in (('experience', 'EXPERIENCE_FIT'), ('degree', 'DEGREE_FIT'), ('skills', 'SKILL_MATCH')):
+        if name in factors:
+            extra[column] = (np.asarray(factors[name])[order] * 100).round(0)
+    return pd.concat([ranked.drop(columns='RANK'), pd.DataFrame(extra, index=ranked.index)], axis=1), len(keep)
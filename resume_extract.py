@@ -0,0 +1,163 @@
+"""Parallel local extraction of the Resumes/<CATEGORY>/<id>.pdf tree into FLATTENED_RESUME_PDFS rows"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from data_sources import RESUME_TABLE, LocalSource
+from extraction_cache import RESUME_RESPONSE_FORMAT
+from normalize import normalize_resumes
+
+DEFAULT_ROOT = 'Resumes'
+
+PROGRAMMING_LANGUAGES = ['Python', 'Java', 'JavaScript', 'TypeScript', 'C#', 'C++', 'SQL', 'R', 'Go', 'Ruby',
+                         'PHP', 'Scala', 'Swift', 'Kotlin', 'MATLAB', 'Perl', 'VBA', 'HTML', 'CSS']
+YEARS_PATTERN = re.compile(r'(\d{1,2})\+?\s*(?:years|yrs)', re.IGNORECASE)
+DEGREE_PATTERNS = {
+    'has_doctorate': re.compile(r'\b(ph\.?d|doctorate|doctor of)(?!\w)', re.IGNORECASE),
+    # "Master" alone is a job title (Scrum Master, Master Electrician) and "Ms." a salutation, so a
+    # master's needs degree context, and a dotted M.S. must not be followed by a capitalised name
+    'has_masters': re.compile(r"\b(master'?s?\s+(?:degree|of|in)\b|m\.s\.(?=\s|$)(?!\s+(?-i:[A-Z][a-z]))"
+                              r"|m\.?sc(?!\w)|mba(?!\w)|m\.?eng(?!\w))", re.IGNORECASE),
+    'has_bachelors': re.compile(r"\b(bachelor'?s?|b\.?s\.|b\.?a\.|b\.?sc)(?!\w)", re.IGNORECASE),
+    'has_high_school': re.compile(r'\b(high school|ged)(?!\w)', re.IGNORECASE),
+}
+
+
+def degree_flags(text):
+    """{degree key: whether text mentions that degree}
+
+    >>> [degree_flags(text)['has_masters'] for text in ("Master of Science, 2019", "Master's degree in Finance",
+    ...     "M.S. in Chemistry", "B.S., M.S.", "MBA", "M.Eng (Civil)")]
+    [True, True, True, True, True, True]
+    >>> [degree_flags(text)['has_masters'] for text in ("Certified Scrum Master", "Master Data Management",
+    ...     "Master Electrician", "Ms. Jane Doe", "M.S. Jane Doe", "Mastered Excel")]
+    [False, False, False, False, False, False]
+    """
+    return {key: bool(pattern.search(text)) for key, pattern in DEGREE_PATTERNS.items()}
+
+
+def iter_resume_files(root=DEFAULT_ROOT):
+    """Stage-style relative paths ('<CATEGORY>/<file>.pdf') of every PDF under root, sorted"""
+    paths = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.upper().endswith('.PDF'):
+                paths.append(Path(directory, name).relative_to(root).as_posix())
+    return sorted(paths)
+
+
+def split_part(value, delimiter, part):
+    """Snowflake SPLIT_PART (1-based; '' when the part does not exist)"""
+    pieces = value.split(delimiter)
+    return pieces[part - 1] if 0 < part <= len(pieces) else ''
+
+
+def pdf_text(path):
+    """Plain text of every page of a PDF"""
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("Local PDF extraction requires pypdf (pip install pypdf)") from e
+    return '\n'.join(page.extract_text() or '' for page in PdfReader(path).pages)
+
+
+class KeywordFieldExtractor:
+    """Heuristic offline stand-in for AI_EXTRACT: answers the prompts it can from plain text"""
+
+    # Part of the extraction cache key; bump when the heuristics change
+    version = 2
+
+    def extract(self, payloads, response_format):
+        return [{'response': self._fields(text, response_format)} for text in payloads]
+
+    def _fields(self, text, response_format):
+        fields = {key: None for key in response_format}
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        fields['job_1'] = lines[0] if lines else None
+        years = [int(match) for match in YEARS_PATTERN.findall(text)]
+        fields['years_of_experience'] = str(max(years)) if years else None
+        for key, found in degree_flags(text).items():
+            fields[key] = 'true' if found else 'false'
+        languages = [name for name in PROGRAMMING_LANGUAGES
+                     if re.search(r'(?<![\w+#])' + re.escape(name) + r'(?![\w+#])', text)]
+        fields['programming_languages'] = ', '.join(languages) if languages else None
+        return {key: value for key, value in fields.items() if key in response_format}
+
+
+def _extract_one(args):
+    root, relative_path, extractor = args
+    started = time.perf_counter()
+    try:
+        text = pdf_text(os.path.join(root, relative_path))
+        info = extractor.extract([text], RESUME_RESPONSE_FORMAT)[0]
+        error = None
+    except Exception as e:
+        text, info, error = '', None, f'{type(e).__name__}: {e}'
+    return relative_path, info, len(text), error, time.perf_counter() - started, os.getpid()
+
+
+def extract_resumes(root=DEFAULT_ROOT, extractor=None, workers=None, chunksize=8):
+    """(FLATTENED_RESUME_PDFS frame, errors frame, throughput stats) for every PDF under root"""
+    extractor = extractor or KeywordFieldExtractor()
+    workers = workers or os.cpu_count() or 1
+    paths = iter_resume_files(root)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_extract_one, [(root, path, extractor) for path in paths], chunksize=chunksize))
+    wall = time.perf_counter() - started
+
+    extracted_at = pd.Timestamp.now(tz='UTC')
+    rows, errors = [], []
+    busy = {}
+    for relative_path, info, chars, error, seconds, pid in results:
+        busy[pid] = busy.get(pid, 0.0) + seconds
+        if error is not None:
+            errors.append({'FILE_PATH': relative_path, 'ERROR': error})
+            continue
+        rows.append({
+            'RELATIVE_PATH': relative_path,
+            'FILE_URL': Path(root, relative_path).resolve().as_uri(),
+            'EXTRACTION_TIMESTAMP': extracted_at,
+            'CATEGORY': split_part(relative_path, '/', 1),
+            'RESUME_ID': split_part(relative_path, '/', 2),
+            'EXTRACTED_INFO': info,
+        })
+
+    stats = {
+        'files': len(paths),
+        'extracted': len(rows),
+        'failed': len(errors),
+        'workers': workers,
+        'wall_seconds': wall,
+        'files_per_second': len(paths) / wall if wall else 0.0,
+        # Share of the pool's available time spent inside extraction
+        'worker_utilization': sum(busy.values()) / (wall * workers) if wall else 0.0,
+    }
+    raw = pd.DataFrame(rows, columns=['RELATIVE_PATH', 'FILE_URL', 'EXTRACTION_TIMESTAMP', 'CATEGORY', 'RESUME_ID', 'EXTRACTED_INFO'])
+    return normalize_resumes(raw), pd.DataFrame(errors, columns=['FILE_PATH', 'ERROR']), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract resume fields from a local Resumes/<CATEGORY>/<id>.pdf tree")
+    parser.add_argument('root', nargs='?', default=DEFAULT_ROOT)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--data-dir', help="write FLATTENED_RESUME_PDFS into this local replica directory")
+    args = parser.parse_args(argv)
+
+    resumes, errors, stats = extract_resumes(args.root, workers=args.workers)
+    print(f"{stats['extracted']}/{stats['files']} files in {stats['wall_seconds']:.2f}s "
+          f"({stats['files_per_second']:.1f} files/s, {stats['worker_utilization']:.0%} worker utilization "
+          f"across {stats['workers']} workers)")
+    for _, error in errors.iterrows():
+        print(f"  failed: {error['FILE_PATH']}: {error['ERROR']}")
+    if args.data_dir:
+        LocalSource(args.data_dir).write_table(RESUME_TABLE, resumes)
+
+
+if __name__ == '__main__':
+    main()
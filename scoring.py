@@ -0,0 +1,258 @@
+"""Batched match scoring for the gold layer: embed each entity once, score blocks with one matmul"""
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from data_sources import GOLD_TABLE, JOBREQ_TABLE, RESUME_TABLE, TABLE_SCHEMAS
+from embedding_store import REQ_STORE, RESUME_STORE, embed_with_store
+
+# OBJECT_CONSTRUCT keys -> source columns, as built in "04 - Extract Resume.sql"
+RESUME_EMBEDDING_FIELDS = {
+    'job_1': 'MOST_RECENT_JOB_TITLE',
+    'years_of_experience': 'YEARS_OF_EXPERIENCE',
+    'technical_skills': 'TECHNICAL_SKILLS',
+    'additional_skills': 'ADDITIONAL_SKILLS',
+    'certifications': 'CERTIFICATIONS',
+    'job_titles_list': 'JOB_TITLES_LIST',
+    'has_doctorate': 'HAS_DOCTORATE',
+    'has_masters': 'HAS_MASTERS',
+    'has_bachelors': 'HAS_BACHELORS',
+    'has_highschool': 'HAS_HIGH_SCHOOL_DIPLOMA',
+    'doctorate_name': 'DOCTORATE_NAME',
+    'masters_name': 'MASTERS_NAME',
+    'bachelors_name': 'BACHELORS_NAME',
+    'spoken_languages_bool': 'SPOKEN_LANGUAGES_BOOL',
+    'spoken_languages': 'SPOKEN_LANGUAGES',
+    'programming_languages': 'PROGRAMMING_LANGUAGES',
+    'leadership_experience_bool': 'LEADERSHIP_EXPERIENCE_BOOL',
+    'leadership_experience': 'LEADERSHIP_EXPERIENCE',
+}
+
+# OBJECT_CONSTRUCT keys -> source columns, as built in "03 - Extract Raw Data.sql"
+JOBREQ_EMBEDDING_FIELDS = {
+    'job_1': 'JOB_TITLE',
+    'years_of_experience': 'YEARS_OF_EXPERIENCE_REQUIRED',
+    'technical_skills': 'TECHNICAL_SKILLS_REQUIRED',
+    'additional_skills': 'ADDITIONAL_SKILLS_REQUIRED',
+    'certifications': 'CERTIFICATIONS_REQUIRED',
+    'job_titles_list': 'JOB_TITLES_LIST',
+    'has_doctorate': 'REQUIRES_DOCTORATE',
+    'has_masters': 'REQUIRES_MASTERS',
+    'has_bachelors': 'REQUIRES_BACHELORS',
+    'has_highschool': 'REQUIRES_HIGH_SCHOOL_DIPLOMA',
+    'doctorate_name': 'REQUIRED_DOCTORATE_FIELD',
+    'masters_name': 'REQUIRED_MASTERS_FIELD',
+    'bachelors_name': 'REQUIRED_BACHELORS_FIELD',
+    'spoken_languages_bool': 'REQUIRES_NON_ENGLISH_LANGUAGES',
+    'spoken_languages': 'SPOKEN_LANGUAGES_REQUIRED',
+    'programming_languages': 'PROGRAMMING_LANGUAGES_REQUIRED',
+    'leadership_experience_bool': 'REQUIRES_LEADERSHIP_EXPERIENCE',
+    'leadership_experience': 'LEADERSHIP_EXPERIENCE_DETAILS',
+}
+
+GOLD_COLUMNS = [column for column, _ in TABLE_SCHEMAS[GOLD_TABLE]]
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#.]+")
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def object_text(row, fields):
+    """TO_VARCHAR(OBJECT_CONSTRUCT(...)) for one row: NULLs dropped, keys sorted, compact JSON"""
+    obj = {}
+    for key, column in fields.items():
+        value = row.get(column)
+        if value is None or (not isinstance(value, (list, dict, str)) and pd.isna(value)):
+            continue
+        obj[key] = _json_value(value)
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def entity_texts(frame, variant_column, fields):
+    """Serialized embedding objects, reusing the stored VARIANT column where it is populated"""
+    if variant_column in frame.columns:
+        stored = frame[variant_column]
+    else:
+        stored = pd.Series([None] * len(frame), index=frame.index)
+    texts = []
+    for row, variant in zip(frame.to_dict('records'), stored):
+        if isinstance(variant, str) and variant:
+            texts.append(variant)
+        elif isinstance(variant, dict):
+            texts.append(json.dumps(variant, sort_keys=True, separators=(',', ':'), default=str))
+        else:
+            texts.append(object_text(row, fields))
+    return texts
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class HashingEmbedder:
+    """Deterministic local embedder: signed feature hashing of word tokens"""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(token.encode('utf-8')) for token in TOKEN_PATTERN.findall(str(text).lower())),
+                dtype=np.uint32
+            )
+            if not len(hashes):
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[i], hashes % self.dim, signs)
+        return _normalize(vectors)
+
+
+class CortexEmbedder:
+    """Snowflake Cortex embeddings, one statement per batch of texts"""
+
+    def __init__(self, source, model='nv-embed-qa-4', batch_size=500):
+        self.source = source
+        self.model = model
+        self.batch_size = batch_size
+
+    def embed(self, texts):
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            result = self.source.sql("""
+            SELECT f.index AS IDX, SNOWFLAKE.CORTEX.EMBED_TEXT_1024(?, f.value::STRING) AS EMBEDDING
+            FROM TABLE(FLATTEN(INPUT => PARSE_JSON(?))) f
+            ORDER BY f.index
+            """, params=[self.model, json.dumps(list(batch))])
+            batches.append(np.array([
+                json.loads(vector) if isinstance(vector, str) else list(vector)
+                for vector in result['EMBEDDING']
+            ], dtype=np.float32))
+        if not batches:
+            return np.zeros((0, 1024), dtype=np.float32)
+        return _normalize(np.vstack(batches))
+
+
+def rank_block(scores, top_k=None):
+    """Column indexes of each row's best scores, best first, and the matching scores"""
+    n_cols = scores.shape[1]
+    if top_k is not None and top_k < n_cols:
+        candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    else:
+        candidates = np.broadcast_to(np.arange(n_cols), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def score_pairs(resumes, reqs, embedder, top_k=None, resume_vectors=None, req_vectors=None):
+    """(req row, resume row, score, rank) arrays for every req against the resumes in its category block"""
+    if resume_vectors is None:
+        resume_vectors = embedder.embed(entity_texts(resumes, 'VECTOR_EMBEDDING_VARIANT', RESUME_EMBEDDING_FIELDS))
+    if req_vectors is None:
+        req_vectors = embedder.embed(entity_texts(reqs, 'VECTOR_EMBEDDING_VARIANT_JOBREQ', JOBREQ_EMBEDDING_FIELDS))
+
+    # Same join as the SQL build: resumes dumped under a REQ_ID folder compete for that req
+    resume_blocks = pd.Series(np.arange(len(resumes))).groupby(resumes['CATEGORY'].to_numpy()).indices
+    req_blocks = pd.Series(np.arange(len(reqs))).groupby(reqs['REQ_ID'].to_numpy()).indices
+
+    req_rows, resume_rows, scores, ranks = [], [], [], []
+    for key, q_idx in req_blocks.items():
+        r_idx = resume_blocks.get(key)
+        if r_idx is None or not len(r_idx):
+            continue
+        block = req_vectors[q_idx] @ resume_vectors[r_idx].T
+        best, best_scores = rank_block(block, top_k)
+        k = best.shape[1]
+        req_rows.append(np.repeat(q_idx, k))
+        resume_rows.append(r_idx[best].ravel())
+        scores.append(best_scores.ravel())
+        ranks.append(np.tile(np.arange(1, k + 1), len(q_idx)))
+
+    if not req_rows:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float32), empty
+    return np.concatenate(req_rows), np.concatenate(resume_rows), np.concatenate(scores), np.concatenate(ranks)
+
+
+def entity_vectors(frame, variant_column, fields, embedder, id_column=None, store_path=None):
+    """Unit vectors for resume or req rows; with a store, only new or changed entities are embedded"""
+    texts = entity_texts(frame, variant_column, fields)
+    if store_path is None:
+        return embedder.embed(texts)
+    vectors, _ = embed_with_store(store_path, frame[id_column].tolist(), texts, embedder)
+    return vectors
+
+
+def score_gold(resumes, reqs, embedder=None, top_k=None, store_dir=None):
+    """GOLD_TABLE_COMPARISONS-shaped frame from FLATTENED_RESUME_PDFS and JOBREQ_FLATTENED frames
+
+    With store_dir, vectors are kept in embedding stores under it (see embedding_store.py)
+    and reused across builds; the gold table carries scores and descriptive columns, no vectors.
+    """
+    embedder = embedder or HashingEmbedder()
+    resumes = resumes.reset_index(drop=True)
+    reqs = reqs.reset_index(drop=True)
+    req_rows, resume_rows, scores, ranks = score_pairs(
+        resumes, reqs, embedder, top_k,
+        resume_vectors=entity_vectors(resumes, 'VECTOR_EMBEDDING_VARIANT', RESUME_EMBEDDING_FIELDS, embedder,
+                                      'RESUME_ID', store_dir and os.path.join(store_dir, RESUME_STORE)),
+        req_vectors=entity_vectors(reqs, 'VECTOR_EMBEDDING_VARIANT_JOBREQ', JOBREQ_EMBEDDING_FIELDS, embedder,
+                                   'REQ_ID', store_dir and os.path.join(store_dir, REQ_STORE)),
+    )
+
+    def resume_col(column):
+        if column not in resumes.columns:
+            return None
+        return resumes[column].to_numpy()[resume_rows]
+
+    def req_col(column):
+        if column not in reqs.columns:
+            return None
+        return reqs[column].to_numpy()[req_rows]
+
+    gold = pd.DataFrame({
+        'REQ_ID': req_col('REQ_ID'),
+        'JOB_TITLE': req_col('JOB_TITLE'),
+        'RESUME_ID': resume_col('RESUME_ID'),
+        'RESUME_TECH_SKILLS': resume_col('TECHNICAL_SKILLS'),
+        'RESUME_YOE': resume_col('YEARS_OF_EXPERIENCE'),
+        'REQ_TECH_SKILLS': req_col('TECHNICAL_SKILLS_REQUIRED'),
+        'REQ_YOE': req_col('YEARS_OF_EXPERIENCE_REQUIRED'),
+        'RESUME_CURRENT_JOB': resume_col('MOST_RECENT_JOB_TITLE'),
+        'RESUME_JOB_TITLE': req_col('JOB_TITLE'),
+        'MATCH_SCORE': scores.astype(np.float64),
+        'FILE_PATH': resume_col('FILE_PATH'),
+        'FILE_URL': resume_col('FILE_URL'),
+        'CATEGORY': req_col('CATEGORY'),
+        'COMMUNITY_VOLUNTEER_BOOL': resume_col('COMMUNITY_VOLUNTEER_BOOL'),
+        'COMMUNITY_VOLUNTEER': resume_col('COMMUNITY_VOLUNTEER'),
+        'COLLEGE_SPORTS': resume_col('COLLEGE_SPORTS'),
+        'COLLEGE_SPORTS_DIVISION': resume_col('COLLEGE_SPORTS_DIVISION'),
+        'INTERESTING': resume_col('INTERESTING'),
+        'PERSONAL_INTERESTS': resume_col('PERSONAL_INTERESTS'),
+        'SPOKEN_LANGUAGES': resume_col('SPOKEN_LANGUAGES'),
+        'RANK_WITHIN_REQ': ranks,
+        'FIRSTNAME_LASTNAME': None,
+    }, columns=GOLD_COLUMNS)
+    # Blocks come out grouped by REQ_ID and ranked; ORDER BY REQ_ID, match_score DESC
+    return gold.sort_values(['REQ_ID', 'RANK_WITHIN_REQ'], kind='stable').reset_index(drop=True)
+
+
+def build_gold_table(source, embedder=None, top_k=None, store_dir=None):
+    """Score every resume x req pair held by a data source"""
+    resumes = source.sql(f"SELECT * FROM {RESUME_TABLE}")
+    reqs = source.sql(f"SELECT * FROM {JOBREQ_TABLE}")
+    return score_gold(resumes, reqs, embedder, top_k, store_dir)
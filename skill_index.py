@@ -0,0 +1,137 @@
+"""Normalized skill inverted index over resumes, for in-memory must-have / nice-to-have candidate filters"""
+import json
+import re
+
+import numpy as np
+
+# Spellings folded onto one skill (keys and values are already normalized)
+SKILL_SYNONYMS = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'postgres': 'postgresql',
+    'ms sql': 'sql server',
+    'mssql': 'sql server',
+    'microsoft sql server': 'sql server',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'google cloud platform': 'gcp',
+    'microsoft azure': 'azure',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+    'ms office': 'microsoft office',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'powerbi': 'power bi',
+    'cicd': 'ci/cd',
+}
+
+SKILL_SEPARATORS = re.compile(r'[,;|\n•]+')
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_skill(text):
+    """Lower-cased, whitespace-collapsed skill with surrounding punctuation dropped and synonyms folded"""
+    skill = WHITESPACE.sub(' ', str(text).lower()).strip(' .-*:()[]"\'')
+    return SKILL_SYNONYMS.get(skill, skill) or None
+
+
+def split_skills(value):
+    """Normalized, de-duplicated skills from a JSON array or a delimited skills string"""
+    if not isinstance(value, str) or not value.strip():
+        return []
+    items = None
+    if value.lstrip().startswith('['):
+        try:
+            items = [str(item) for item in json.loads(value) if item is not None]
+        except ValueError:
+            items = None
+    if items is None:
+        items = SKILL_SEPARATORS.split(value)
+    return list(dict.fromkeys(skill for skill in map(normalize_skill, items) if skill))
+
+
+class SkillIndex:
+    """Posting lists (sorted row arrays, stored CSR-style) from normalized skills to resume rows"""
+
+    def __init__(self, keys, skill_lists):
+        self.keys = list(keys)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        term_ids = {}
+        pair_terms, pair_rows = [], []
+        for row, skills in enumerate(skill_lists):
+            for skill in skills:
+                pair_terms.append(term_ids.setdefault(skill, len(term_ids)))
+                pair_rows.append(row)
+        self.terms = list(term_ids)
+        self.term_ids = term_ids
+        pair_terms = np.asarray(pair_terms, dtype=np.int64)
+        pair_rows = np.asarray(pair_rows, dtype=np.int32)
+        # Sort by (term, row): each term's rows become one contiguous, sorted slice
+        order = np.lexsort((pair_rows, pair_terms))
+        self._postings = pair_rows[order]
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(pair_terms, minlength=len(self.terms)))))
+        self.doc_freq = np.diff(self._offsets)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_resumes(cls, resumes):
+        """Index FLATTENED_RESUME_PDFS rows by FILE_PATH over TECHNICAL_SKILLS and PROGRAMMING_LANGUAGES"""
+        skill_lists = [
+            list(dict.fromkeys(split_skills(technical) + split_skills(languages)))
+            for technical, languages in zip(resumes['TECHNICAL_SKILLS'].tolist(),
+                                            resumes['PROGRAMMING_LANGUAGES'].tolist())
+        ]
+        return cls(resumes['FILE_PATH'].astype(str).tolist(), skill_lists)
+
+    def postings(self, skill):
+        """Sorted rows of the resumes that list a skill"""
+        term = self.term_ids.get(normalize_skill(skill))
+        if term is None:
+            return self._postings[:0]
+        return self._postings[self._offsets[term]:self._offsets[term + 1]]
+
+    def vocabulary(self):
+        """Every indexed skill, most common first"""
+        order = np.argsort(-self.doc_freq, kind='stable')
+        return [self.terms[term] for term in order]
+
+    def lookup(self, keys):
+        """Index row of each key, -1 where the resume is not indexed"""
+        return np.array([self.rows.get(str(key), -1) for key in keys], dtype=np.int64)
+
+    def match(self, rows, must=(), nice=()):
+        """(mask of rows holding every must-have skill, share of all requested skills each row holds)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        # Unindexed rows (-1) point at a sentinel slot that never holds a skill
+        rows = np.where(rows >= 0, rows, len(self.keys))
+        must = list(dict.fromkeys(filter(None, map(normalize_skill, must))))
+        nice = [skill for skill in dict.fromkeys(filter(None, map(normalize_skill, nice))) if skill not in must]
+        held = np.zeros(len(self.keys) + 1, dtype=bool)
+        must_count = np.zeros(len(rows), dtype=np.int32)
+        nice_count = np.zeros(len(rows), dtype=np.int32)
+        for skills, counts in ((must, must_count), (nice, nice_count)):
+            for skill in skills:
+                held[:] = False
+                held[self.postings(skill)] = True
+                counts += held[rows]
+        requested = len(must) + len(nice)
+        overlap = (must_count + nice_count) / requested if requested else np.zeros(len(rows))
+        return must_count == len(must), overlap
+
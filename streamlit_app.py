@@ -1,19 +1,19 @@
 # Import python packages
 import streamlit as st
 import pandas as pd
-from snowflake.snowpark.context import get_active_session
-import json
-
-# Page configuration
-st.set_page_config(
-    page_title="Resume Matcher",
-    page_icon="📋",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
-
-# Custom CSS for sleek, modern design
-st.markdown("""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from data_sources import chunked, open_default_source
+from gold_snapshot import GoldSnapshotCache
+from jobs_dimension import JobDirectory, build_jobs_dimension, read_jobs_dimension
+from instrumentation import TracedSource, open_default_tracer
+from links import LinkCache, open_link_provider
+from prefetch import Prefetcher
+from rerank import DEFAULT_WEIGHTS
+from skill_index import normalize_skill
+
+# Custom CSS for sleek, modern design, injected once per page load by main()
+APP_CSS = """
 <style>
     /* Import modern font */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -260,305 +260,591 @@ st.markdown("""
         background: #40464d;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Bind-parameter IN lists are padded to one of these sizes so only a handful of
+# distinct statements are ever compiled for bulk candidate fetches
+PLACEHOLDER_BUCKETS = (1, 8, 32, 128, 256)
+CANDIDATE_BATCH_SIZE = PLACEHOLDER_BUCKETS[-1]
+
+# Job buttons rendered per page of the left panel
+JOBS_PAGE_SIZE = 25
+# Candidates fetched per "load more" click
+CANDIDATES_PAGE_SIZE = 20
+
+# Threads for concurrent matcher queries; prefetch may use at most PREFETCH_IN_FLIGHT of them
+QUERY_WORKERS = 4
+PREFETCH_IN_FLIGHT = 3
+# Visible jobs after / before the expanded one whose first candidate page is fetched ahead of a click
+PREFETCH_AHEAD = 2
+PREFETCH_BEHIND = 1
+# Seconds a click waits for a prefetch in flight before querying for itself
+PREFETCH_WAIT = 2.0
+
+CANDIDATE_COLUMNS = """
+            'Candidate ' || REPLACE(RESUME_ID, '.pdf', '') as NAME,
+            ROUND(MATCH_SCORE * 100, 0) as MATCH_SCORE,
+            RANK_WITHIN_REQ as RANK,
+            COALESCE(RESUME_CURRENT_JOB, 'Not specified') as CURRENT_ROLE,
+            COALESCE(RESUME_YOE, 0) as YEARS_EXPERIENCE,
+            COALESCE(RESUME_TECH_SKILLS, 'Not specified') as TECH_SKILLS,
+            FILE_PATH"""
+
+# Sample candidates shown when no data source is available
+SAMPLE_CANDIDATES = {
+    'REQ001': [
+        {'NAME': 'Candidate 1', 'CURRENT_ROLE': 'Senior Developer at TechCorp', 'YEARS_EXPERIENCE': 5, 'TECH_SKILLS': 'Python, JavaScript, React, AWS', 'RANK': 1, 'MATCH_SCORE': 94},
+        {'NAME': 'Candidate 2', 'CURRENT_ROLE': 'Full Stack Engineer at StartupXYZ', 'YEARS_EXPERIENCE': 7, 'TECH_SKILLS': 'JavaScript, Node.js, Docker, Kubernetes', 'RANK': 2, 'MATCH_SCORE': 89},
+        {'NAME': 'Candidate 3', 'CURRENT_ROLE': 'Backend Developer at DataCorp', 'YEARS_EXPERIENCE': 4, 'TECH_SKILLS': 'Python, SQL, AWS, Machine Learning', 'RANK': 3, 'MATCH_SCORE': 82},
+    ]
+}
+
+# Jobs dimension for the sample job, one gold row per sample candidate
+SAMPLE_JOBS_DIM = build_jobs_dimension(pd.DataFrame([
+    {'REQ_ID': 'REQ001', 'JOB_TITLE': 'Software Engineer', 'CATEGORY': 'IT',
+     'REQ_TECH_SKILLS': 'Python, JavaScript, React, SQL, AWS'}
+] * len(SAMPLE_CANDIDATES['REQ001'])))
+
+@st.cache_resource(show_spinner=False)
+def get_tracer():
+    """Process-wide tracer for query, cache and render timings"""
+    return open_default_tracer()
+
+@st.cache_resource(show_spinner=False)
+def get_gold_snapshots(source_key, _source):
+    """Gold table snapshot shared by every session reading the same data (source_key, e.g. source.key)
+
+    The cache owns its load threads, so no matcher's pool is pinned to it.
+    """
+    executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix='snapshot-load')
+    return GoldSnapshotCache(_source, executor=executor)
 
 class SimpleResumeMatcher:
-    def __init__(self):
-        try:
-            self.session = get_active_session()
-        except:
-            self.session = None
-    
-    def get_jobs(self):
-        """Get all unique jobs from Snowflake table"""
-        if self.session:
+    def __init__(self, source=None, tracer=None):
+        self.tracer = tracer if tracer is not None else open_default_tracer()
+        # Snowpark session, local DuckDB/Parquet replica, or None for the built-in sample data
+        source = source if source is not None else open_default_source()
+        # Every query is timed, including the snapshot loads and refreshes
+        self.source = TracedSource(source, self.tracer) if source is not None else None
+        # Bounded pool for independent queries (candidate prefetch)
+        self.pool = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix='matcher-query')
+        # Sources without a key (stand-ins) get a snapshot of their own
+        self.snapshots = get_gold_snapshots(getattr(source, 'key', None) or id(source), self.source) \
+            if self.source else None
+        self.prefetcher = Prefetcher(lambda job_id: self._query_candidates_page(job_id, 0, CANDIDATES_PAGE_SIZE),
+                                     self.pool, max_in_flight=PREFETCH_IN_FLIGHT, timeout=PREFETCH_WAIT)
+        # Resume links are generated for rendered cards only and reused until shortly before they expire
+        provider = open_link_provider(self.source)
+        self.links = LinkCache(provider) if provider is not None else None
+    
+    def get_snapshot(self):
+        """Current gold snapshot, or None while it cannot be loaded (per-req queries serve until the next retry)"""
+        if self.snapshots:
+            self.tracer.cache('gold_snapshot', self.snapshots.loaded)
             try:
-                query = """
-                SELECT DISTINCT 
-                    REQ_ID as JOB_ID,
-                    JOB_TITLE,
-                    JOB_TITLE || ' (' || REQ_ID || ')' as TITLE,
-                    CASE 
-                        WHEN CATEGORY = 'MECHANICALCHEMICALQUALITYENGINEERING' THEN 'Core_Engg'
-                        WHEN CATEGORY = 'IT' THEN 'Engineering'
-                        ELSE CATEGORY 
-                    END as DEPARTMENT,
-                    'Job requirements and details for ' || JOB_TITLE || ' (' || REQ_ID || ')' as DESCRIPTION,
-                    COALESCE(REQ_TECH_SKILLS, '["Skills vary by position"]') as REQUIRED_SKILLS
-                FROM HACKATHON_2025.JOE.GOLD_TABLE_COMPARISONS
-                WHERE REQ_ID IS NOT NULL AND JOB_TITLE IS NOT NULL
-                ORDER BY REQ_ID, JOB_TITLE
-                """
-                return self.session.sql(query).to_pandas()
+                return self.snapshots.get()
             except Exception as e:
-                st.error(f"Error connecting to Snowflake: {str(e)}")
-                pass
+                st.error(f"Error loading gold snapshot: {str(e)}")
+        return None
+    
+    def get_job_directory(self):
+        """Job list and departments, from the snapshot or else from one read of JOBS_DIM"""
+        snapshot = self.get_snapshot()
+        if snapshot is not None:
+            return snapshot.directory
+        if self.source:
+            try:
+                return JobDirectory(read_jobs_dimension(self.source))
+            except Exception as e:
+                st.error(f"Error connecting to {self.source.name} data source: {str(e)}")
         
         # Fallback sample data
-        return pd.DataFrame([
-            {
-                'JOB_ID': 'REQ001',
-                'TITLE': 'Software Engineer (REQ001)',
-                'DEPARTMENT': 'Engineering',
-                'DESCRIPTION': 'Job requirements and details for Software Engineer (REQ001)',
-                'REQUIRED_SKILLS': 'Python, JavaScript, React, SQL, AWS'
-            }
-        ])
+        return JobDirectory(SAMPLE_JOBS_DIM)
+    
+    def get_categories(self):
+        """Get department names for the category filter"""
+        return self.get_job_directory().categories
+    
+    def get_jobs(self, category='All', search=''):
+        """Get all unique jobs, optionally for one department and matching a search"""
+        return self.get_job_directory().jobs_for(category, search)
     
     def get_jobs_original(self):
         """Get jobs with original category names for filtering"""
-        if self.session:
-            try:
-                query = """
-                SELECT DISTINCT 
-                    REQ_ID as JOB_ID,
-                    JOB_TITLE || ' (' || REQ_ID || ')' as TITLE,
-                    CATEGORY as DEPARTMENT,
-                    'Job requirements and details for ' || JOB_TITLE || ' (' || REQ_ID || ')' as DESCRIPTION,
-                    '["Skills vary by position"]' as REQUIRED_SKILLS
-                FROM HACKATHON_2025.JOE.GOLD_TABLE_COMPARISONS
-                ORDER BY REQ_ID
-                """
-                return self.session.sql(query).to_pandas()
-            except Exception as e:
-                st.error(f"Error connecting to Snowflake: {str(e)}")
-                pass
-        
-        # Fallback sample data
-        return pd.DataFrame([
-            {
-                'JOB_ID': 'REQ001',
-                'TITLE': 'REQ001',
-                'DEPARTMENT': 'MECHANICALCHEMICALQUALITYENGINEERING',
-                'DESCRIPTION': 'Job requirements and details for REQ001',
-                'REQUIRED_SKILLS': '["Skills vary by position"]'
-            }
-        ])
+        return self.get_job_directory().jobs_original
     
     def get_candidates(self, job_id):
         """Get candidates for a specific job from Snowflake table"""
-        if self.session:
+        return self.get_candidates_bulk([job_id])[job_id]
+    
+    def get_candidates_bulk(self, job_ids, top_n=None):
+        """Get candidates for many jobs in one statement, grouped by job id"""
+        job_ids = list(dict.fromkeys(job_ids))
+        snapshot = self.get_snapshot()
+        if snapshot is not None:
+            return {
+                job_id: snapshot.candidates(job_id) if top_n is None else snapshot.candidates(job_id).head(top_n)
+                for job_id in job_ids
+            }
+        if self.source and job_ids:
             try:
-                query = f"""
-                SELECT 
-                    'Candidate ' || REPLACE(RESUME_ID, '.pdf', '') as NAME,
-                    ROUND(MATCH_SCORE * 100, 0) as MATCH_SCORE,
-                    RANK_WITHIN_REQ as RANK,
-                    COALESCE(RESUME_CURRENT_JOB, 'Not specified') as CURRENT_ROLE,
-                    COALESCE(RESUME_YOE, 0) as YEARS_EXPERIENCE,
-                    COALESCE(RESUME_TECH_SKILLS, 'Not specified') as TECH_SKILLS,
-                    FILE_PATH,
-                    FILE_URL_CLICKABLE
-                FROM HACKATHON_2025.JOE.GOLD_TABLE_COMPARISONS
-                WHERE REQ_ID = '{job_id}'
-                ORDER BY RANK_WITHIN_REQ
-                """
-                return self.session.sql(query).to_pandas()
+                candidates_df = pd.concat(
+                    [self._query_candidates(chunk, top_n) for chunk in chunked(job_ids, CANDIDATE_BATCH_SIZE)],
+                    ignore_index=True
+                )
+                grouped = {job_id: frame.drop(columns='REQ_ID').reset_index(drop=True)
+                           for job_id, frame in candidates_df.groupby('REQ_ID', sort=False)}
+                empty = candidates_df.drop(columns='REQ_ID').iloc[0:0]
+                return {job_id: grouped.get(job_id, empty) for job_id in job_ids}
             except Exception as e:
                 st.error(f"Error loading candidates: {str(e)}")
                 pass
         
         # Sample candidates data
-        candidates_data = {
-            'REQ001': [
-                {'NAME': 'Candidate 1', 'CURRENT_ROLE': 'Senior Developer at TechCorp', 'YEARS_EXPERIENCE': 5, 'TECH_SKILLS': 'Python, JavaScript, React, AWS', 'RANK': 1, 'MATCH_SCORE': 94},
-                {'NAME': 'Candidate 2', 'CURRENT_ROLE': 'Full Stack Engineer at StartupXYZ', 'YEARS_EXPERIENCE': 7, 'TECH_SKILLS': 'JavaScript, Node.js, Docker, Kubernetes', 'RANK': 2, 'MATCH_SCORE': 89},
-                {'NAME': 'Candidate 3', 'CURRENT_ROLE': 'Backend Developer at DataCorp', 'YEARS_EXPERIENCE': 4, 'TECH_SKILLS': 'Python, SQL, AWS, Machine Learning', 'RANK': 3, 'MATCH_SCORE': 82},
-            ]
+        return {
+            job_id: pd.DataFrame(SAMPLE_CANDIDATES.get(job_id, [])[:top_n])
+            for job_id in job_ids
         }
-        
-        if job_id in candidates_data:
-            return pd.DataFrame(candidates_data[job_id])
-        else:
-            return pd.DataFrame()
-
-def main():
-    # Initialize matcher
-    matcher = SimpleResumeMatcher()
-    
-    # Main title
-    st.markdown('<h1 class="main-title">Resume Matcher</h1>', unsafe_allow_html=True)
-    
-    # Create two columns
-    col1, col2 = st.columns([1, 2], gap="large")
     
-    with col1:
-        st.markdown('<div class="section-header">Job Categories</div>', unsafe_allow_html=True)
+    def get_candidates_page(self, job_id, after_rank=0, limit=CANDIDATES_PAGE_SIZE):
+        """Next page of candidates ranked after after_rank; returns (candidates, whether more follow)"""
+        snapshot = self.get_snapshot()
+        if snapshot is not None:
+            return snapshot.candidates_page(job_id, after_rank, limit)
+        if self.source:
+            if after_rank == 0 and limit == CANDIDATES_PAGE_SIZE:
+                hit, page = self.prefetcher.get(job_id)
+                self.tracer.cache('candidate_prefetch', hit)
+                if hit:
+                    return page
+            try:
+                return self._query_candidates_page(job_id, after_rank, limit)
+            except Exception as e:
+                st.error(f"Error loading candidates: {str(e)}")
         
-        # Get unique categories from the database
+        sample_df = pd.DataFrame(SAMPLE_CANDIDATES.get(job_id, []))
+        if sample_df.empty:
+            return sample_df, False
+        remaining = sample_df[sample_df['RANK'] > after_rank]
+        return remaining.iloc[:limit], len(remaining) > limit
+    
+    def get_skill_options(self, job_id):
+        """Skills offered by the candidate filters: the job's own first, then every indexed skill by frequency"""
+        snapshot = self.get_snapshot()
+        if snapshot is None or snapshot.skills is None:
+            return None
+        job = snapshot.jobs[snapshot.jobs['JOB_ID'] == job_id]
+        job_skills = job['SKILLS'].iloc[0] if not job.empty and job['SKILLS'].iloc[0] else []
+        return list(dict.fromkeys([normalize_skill(skill) for skill in job_skills] + snapshot.skills.vocabulary()))
+    
+    def get_ranked_candidates(self, job_id, weights=None, must=(), nice=(), limit=CANDIDATES_PAGE_SIZE):
+        """(top candidates holding every must-have skill, re-ranked by the weighted factors, number ranked)"""
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return pd.DataFrame(), 0
+        with self.tracer.span('rerank', job_id):
+            return snapshot.ranked_candidates(job_id, weights, must, nice, limit)
+    
+    def with_resume_links(self, candidates_df):
+        """Candidates with FILE_URL_CLICKABLE filled in for their FILE_PATHs, one batch for every link not cached"""
+        if self.links is None or candidates_df.empty or 'FILE_PATH' not in candidates_df:
+            return candidates_df
         try:
-            category_query = """
-            SELECT DISTINCT 
-                CASE 
-                    WHEN CATEGORY = 'MECHANICALCHEMICALQUALITYENGINEERING' THEN 'Core_Engg'
-                    WHEN CATEGORY = 'IT' THEN 'Engineering'
-                    ELSE CATEGORY 
-                END as CATEGORY
-            FROM HACKATHON_2025.JOE.GOLD_TABLE_COMPARISONS 
-            WHERE CATEGORY IS NOT NULL
-            ORDER BY CATEGORY
-            """
-            categories_df = matcher.session.sql(category_query).to_pandas() if matcher.session else pd.DataFrame()
-            categories = categories_df['CATEGORY'].tolist() if not categories_df.empty else ['HR', 'Engineering', 'IT', 'Banking', 'Sales']
-        except:
-            categories = ['HR', 'Engineering', 'IT', 'Banking', 'Sales']
-        
-        # Category filter
-        selected_category = st.selectbox(
-            "Filter by Department:",
-            options=['All'] + categories,
-            index=0,
-            key="category_filter"
-        )
-        
-        st.markdown('<div class="section-header">Job Positions</div>', unsafe_allow_html=True)
-        
-        # Get jobs
-        jobs_df = matcher.get_jobs()
+            links, generated = self.links.links(candidates_df['FILE_PATH'].tolist())
+        except Exception as e:
+            st.warning(f"Resume links unavailable: {str(e)}")
+            return candidates_df
+        self.tracer.cache('resume_links', generated == 0, generated=generated)
+        return candidates_df.assign(FILE_URL_CLICKABLE=candidates_df['FILE_PATH'].map(links))
+    
+    def prefetch_candidates(self, job_ids, scope=None):
+        """Fetch first candidate pages in the background for a session (scope); a no-op while the snapshot serves them
+
+        Pages come from the query path, which is only used until the snapshot has
+        loaded, or while its load is failing and backing off.
+        """
+        if not self.source or (self.snapshots and self.snapshots.loaded):
+            return []
+        return self.prefetcher.prefetch(job_ids, scope)
+    
+    def _query_candidates_page(self, job_id, after_rank, limit):
+        # Keyset pagination: the cursor is the last rank shown, so each page costs the same
+        # no matter how deep it is; one extra row tells whether another page exists
+        query = f"""
+        SELECT {CANDIDATE_COLUMNS}
+        FROM HACKATHON_2025.JOE.GOLD_TABLE_COMPARISONS
+        WHERE REQ_ID = ? AND RANK_WITHIN_REQ > ?
+        ORDER BY RANK_WITHIN_REQ
+        LIMIT {int(limit) + 1}
+        """
+        page_df = self.source.sql(query, params=[job_id, int(after_rank)])
+        return page_df.iloc[:limit], len(page_df) > limit
+    
+    def _query_candidates(self, job_ids, top_n):
+        # Pad the IN list to a fixed bucket size so the statement text (and its plan) is reused
+        bucket = next(size for size in PLACEHOLDER_BUCKETS if size >= len(job_ids))
+        params = list(job_ids) + [job_ids[-1]] * (bucket - len(job_ids))
+        rank_filter = ""
+        if top_n is not None:
+            rank_filter = "AND RANK_WITHIN_REQ <= ?"
+            params.append(int(top_n))
+        query = f"""
+        SELECT 
+            REQ_ID,{CANDIDATE_COLUMNS}
+        FROM HACKATHON_2025.JOE.GOLD_TABLE_COMPARISONS
+        WHERE REQ_ID IN ({', '.join(['?'] * bucket)})
+        {rank_filter}
+        ORDER BY REQ_ID, RANK_WITHIN_REQ
+        """
+        return self.source.sql(query, params=params)
+
+def candidate_card_html(candidate):
+    """HTML for one candidate card"""
+    rank_class = f"rank-{candidate['RANK']}"
+
+    # Prepare resume button HTML
+    resume_button_html = ""
+    if 'FILE_URL_CLICKABLE' in candidate and pd.notna(candidate['FILE_URL_CLICKABLE']) and candidate['FILE_URL_CLICKABLE']:
+        resume_button_html = f'''
+        <div style="margin-top: 1rem;">
+            <a href="{candidate['FILE_URL_CLICKABLE']}" target="_blank" style="text-decoration: none;">
+                <button style="
+                    background: linear-gradient(135deg, #238636 0%, #2ea043 100%);
+                    color: white;
+                    border: 1px solid #2ea043;
+                    border-radius: 6px;
+                    padding: 0.5rem 1rem;
+                    font-size: 0.9rem;
+                    font-weight: 500;
+                    cursor: pointer;
+                    transition: all 0.2s ease;
+                " onmouseover="this.style.background='linear-gradient(135deg, #2ea043 0%, #34d058 100%)'; this.style.transform='translateY(-1px)'" 
+                   onmouseout="this.style.background='linear-gradient(135deg, #238636 0%, #2ea043 100%)'; this.style.transform='translateY(0)'">
+                    📄 View Resume
+                </button>
+            </a>
+        </div>
+        '''
+    elif 'FILE_PATH' in candidate and pd.notna(candidate['FILE_PATH']) and candidate['FILE_PATH']:
+        resume_button_html = f'''
+        <div style="margin-top: 1rem; color: #8b949e; font-size: 0.8rem;">
+            📁 Resume: {candidate['FILE_PATH']}
+        </div>
+        '''
+
+    skill_match_html = ""
+    if 'SKILL_MATCH' in candidate and pd.notna(candidate['SKILL_MATCH']):
+        skill_match_html = f" · {candidate['SKILL_MATCH']:.0f}% Skills"
+    if 'SCORE' in candidate:
+        skill_match_html += f" · {candidate['SCORE']:.0f} Overall"
+        if candidate['MATCH_RANK'] != candidate['RANK']:
+            skill_match_html += f" (was #{candidate['MATCH_RANK']})"
+
+    # Candidate card with embedded button
+    return f'''
+        <div class="candidate-card">
+            <div class="candidate-header">
+                <div>
+                    <div class="candidate-name">{candidate['NAME']}</div>
+                    <div class="candidate-info">Current Role: {candidate['CURRENT_ROLE']}</div>
+                    <div class="candidate-info">Experience: {candidate.get('YEARS_EXPERIENCE', 0)} years</div>
+                </div>
+                <div class="rank-badge {rank_class}">
+                    #{candidate['RANK']}
+                </div>
+            </div>
+            <div class="match-score">
+                {candidate['MATCH_SCORE']:.0f}% Match{skill_match_html}
+            </div>
+            {resume_button_html}
+        </div>
+    '''
+
+def render_candidate_cards(candidates_df):
+    """HTML for every candidate card, so a page of candidates renders in one st.markdown call"""
+    cards = [candidate_card_html(candidate) for candidate in candidates_df.to_dict('records')]
+    # Drop indentation and blank lines so the markdown renderer keeps the whole block as raw HTML
+    return '\n'.join(line.strip() for card in cards for line in card.splitlines() if line.strip())
+
+def fragment(func):
+    """st.fragment (st.experimental_fragment on older Streamlit); a plain function where neither exists"""
+    decorator = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+    return decorator(func) if decorator else func
+
+@st.cache_resource(show_spinner=False)
+def get_matcher():
+    """One matcher per process; its data comes from the shared gold snapshot"""
+    return SimpleResumeMatcher(tracer=get_tracer())
+
+def debug_enabled():
+    """True when the page was opened with ?debug=1"""
+    if hasattr(st, 'query_params'):
+        value = st.query_params.get('debug')
+    else:
+        value = (st.experimental_get_query_params().get('debug') or [None])[-1]
+    return value == '1'
+
+def debug_panel(tracer):
+    """Timing summary and raw trace, only shown with ?debug=1"""
+    with st.expander("Debug: query and render timings", expanded=True):
+        summary = pd.DataFrame(tracer.summary())
+        if summary.empty:
+            st.write("No events recorded yet")
+            return
+        # Query rows are warehouse/DuckDB time; render rows include the queries made while drawing the panel
+        st.dataframe(summary, hide_index=True)
+        events = tracer.snapshot()
+        st.dataframe(pd.DataFrame(events[-50:]), hide_index=True)
+        st.download_button("Download JSONL trace", tracer.to_jsonl(), file_name="resume_matcher_trace.jsonl",
+                           mime="application/json")
+
+def set_job_page(page):
+    st.session_state.job_page = page
+
+def toggle_job(unique_key, job_id):
+    """Expand a job and select it for the candidate panel, or collapse it if it is the expanded one"""
+    if st.session_state.expanded_job_id == unique_key:
+        st.session_state.expanded_job_id = None
+        st.session_state.selected_job_id = None
+    else:
+        st.session_state.expanded_job_id = unique_key
+        st.session_state.selected_job_id = job_id  # Still use original job_id for candidate lookup
+
+def load_more_candidates(matcher, pages, after_rank):
+    """Append the next keyset page of candidates for the job shown in pages"""
+    next_page, has_more = matcher.get_candidates_page(pages['job_id'], after_rank=after_rank)
+    pages['frames'].append(next_page)
+    pages['has_more'] = has_more
+
+def prefetch_neighbours(matcher, visible_ids):
+    """Start fetching candidates for the selected job and the visible jobs around it"""
+    selected = st.session_state.get('selected_job_id')
+    if selected not in visible_ids:
+        return
+    position = visible_ids.index(selected)
+    # Recruiters mostly move down the list, so the jobs below come before the one above
+    neighbours = (visible_ids[position + 1:position + 1 + PREFETCH_AHEAD]
+                  + visible_ids[max(position - PREFETCH_BEHIND, 0):position])
+    # The matcher is shared by every session, so each one withdraws only its own earlier requests
+    scope = st.session_state.setdefault('prefetch_scope', uuid.uuid4().hex)
+    matcher.prefetch_candidates([selected] + neighbours, scope)
+
+@fragment
+def matcher_panels(matcher):
+    """Job list and candidate panel side by side in one fragment
+
+    Job clicks, filters, paging and "load more" rerun only this fragment; both
+    panels share it so a job click can update the candidates without an app rerun.
+    """
+    with matcher.tracer.rerun('panels'):
+        col1, col2 = st.columns([1, 2], gap="large")
+        with col1:
+            job_list_panel(matcher)
+        with col2:
+            candidate_panel(matcher)
+
+def job_list_panel(matcher):
+    """Category filter, search and the current page of jobs"""
+    with matcher.tracer.span('render', 'job_list'):
+        _job_list_panel(matcher)
+
+def _job_list_panel(matcher):
+    st.markdown('<div class="section-header">Job Categories</div>', unsafe_allow_html=True)
+    
+    # Departments and jobs both come from one job directory (the snapshot's, or one JOBS_DIM read)
+    directory = matcher.get_job_directory()
+    categories = directory.categories
+    
+    # Category filter
+    selected_category = st.selectbox(
+        "Filter by Department:",
+        options=['All'] + categories,
+        index=0,
+        key="category_filter"
+    )
+    
+    st.markdown('<div class="section-header">Job Positions</div>', unsafe_allow_html=True)
+    
+    search_text = st.text_input(
+        "Search jobs:",
+        key="job_search",
+        placeholder="Title, department or skill"
+    )
+    
+    # Get jobs for the selected department
+    jobs_df = directory.jobs_for(selected_category, search_text)
+    
+    # Go back to the first page whenever the filter or search changes
+    job_filter = (selected_category, search_text)
+    if st.session_state.get('job_filter') != job_filter:
+        st.session_state.job_filter = job_filter
+        st.session_state.job_page = 0
+    page_count = max(1, -(-len(jobs_df) // JOBS_PAGE_SIZE))
+    page = min(st.session_state.job_page, page_count - 1)
+    
+    # Only the visible page of jobs is rendered; titles and skill tags were prepared at load time
+    visible_df = jobs_df.iloc[page * JOBS_PAGE_SIZE:(page + 1) * JOBS_PAGE_SIZE]
+    prefetch_neighbours(matcher, visible_df['JOB_ID'].tolist() if not jobs_df.empty else [])
+    if not jobs_df.empty:
+        for idx, job in visible_df.iterrows():
+            job_id = job['JOB_ID']
+            # Create unique key combining job_id and index to avoid duplicates
+            unique_key = f"{job_id}_{idx}"
+            is_expanded = st.session_state.expanded_job_id == unique_key
+            
+            expand_symbol = "▼" if is_expanded else "▶"
+            # The callback updates the selection before the panels rerun, so the click reruns only
+            # the panels fragment, with the candidate panel already showing the new job
+            st.button(f"{expand_symbol} {job['DISPLAY_TITLE']}", key=f"toggle_{unique_key}",
+                      on_click=toggle_job, args=(unique_key, job_id))
+            
+            # Show job details if this job is expanded
+            if is_expanded:
+                st.markdown(f'''
+                <div class="job-card selected" style="margin-top: -0.5rem; margin-bottom: 1rem;">
+                    <div style="color: #8b949e; font-size: 0.9rem; line-height: 1.4; margin-bottom: 1rem;">
+                        {job['DESCRIPTION']}
+                    </div>
+                    <div style="margin-bottom: 1rem;">
+                        <strong style="color: #ffffff; font-size: 0.9rem;">Required Skills:</strong>
+                    </div>
+                    <div style="display: flex; flex-wrap: wrap; gap: 0.5rem;">
+                        {job['SKILLS_HTML']}
+                    </div>
+                </div>
+                ''', unsafe_allow_html=True)
         
-        # Map job titles to categories
-        job_category_mapping = {
-            'Senior Software Engineer': 'Engineering',
-            'Product Marketing Manager': 'Sales',
-            'Senior UX Designer': 'IT',
-            'Data Scientist': 'Engineering',
-            'HR Business Partner': 'HR',
-            'Systems Administrator': 'IT',
-            'Investment Banking Analyst': 'Banking',
-            'Sales Development Representative': 'Sales',
-            'Software Engineer': 'Engineering',
-            'Marketing Manager': 'Sales',
-            'Product Designer': 'IT'
-        }
+        if page_count > 1:
+            # Callbacks update the page before this panel reruns, so no second rerun is needed
+            prev_col, info_col, next_col = st.columns([1, 2, 1])
+            prev_col.button("◀", key="job_page_prev", disabled=page == 0,
+                            on_click=set_job_page, args=(page - 1,))
+            info_col.caption(
+                f"{page * JOBS_PAGE_SIZE + 1}–{min((page + 1) * JOBS_PAGE_SIZE, len(jobs_df))} of {len(jobs_df)} jobs"
+            )
+            next_col.button("▶", key="job_page_next", disabled=page >= page_count - 1,
+                            on_click=set_job_page, args=(page + 1,))
+    else:
+        st.write("No jobs available")
+
+def candidate_panel(matcher):
+    """Candidates for the selected job"""
+    with matcher.tracer.span('render', 'candidates'):
+        _candidate_panel(matcher)
+
+def show_more_ranked_candidates(shown):
+    shown['count'] += CANDIDATES_PAGE_SIZE
+
+def reset_ranking_weights():
+    for name, weight in DEFAULT_WEIGHTS.items():
+        st.session_state[f'weight_{name}'] = weight
+
+def skill_filters(matcher, job_id):
+    """Must-have / nice-to-have skill pickers; ([], []) when no skill index is loaded"""
+    options = matcher.get_skill_options(job_id)
+    if not options:
+        return [], []
+    # Keep earlier picks selectable when they are not among this job's options
+    selected = st.session_state.get('must_skills', []) + st.session_state.get('nice_skills', [])
+    options = list(dict.fromkeys(options + selected))
+    must_col, nice_col = st.columns(2)
+    must = must_col.multiselect("Must-have skills", options, key="must_skills")
+    nice = nice_col.multiselect("Nice-to-have skills", options, key="nice_skills")
+    return must, nice
+
+def ranking_weights():
+    """Sliders weighting match, experience, degree and skill fit; DEFAULT_WEIGHTS until moved"""
+    with st.expander("Ranking weights"):
+        columns = st.columns(len(DEFAULT_WEIGHTS))
+        labels = {'match': "Match", 'experience': "Experience", 'degree': "Degree", 'skills': "Skills"}
+        weights = {}
+        for column, (name, weight) in zip(columns, DEFAULT_WEIGHTS.items()):
+            # Seeded through session state so the reset callback can move the sliders back
+            st.session_state.setdefault(f'weight_{name}', weight)
+            weights[name] = column.slider(labels[name], 0.0, 1.0, step=0.05, key=f'weight_{name}')
+        st.button("Reset weights", key="reset_ranking_weights", on_click=reset_ranking_weights)
+    return weights
+
+def ranked_candidate_list(matcher, job_id, weights, must, nice):
+    """Candidates passing the skill filters, best composite score first, a page at a time"""
+    ranking_key = (job_id, tuple(sorted(weights.items())), tuple(must), tuple(nice))
+    shown = st.session_state.get('ranked_shown')
+    if shown is None or shown['key'] != ranking_key:
+        shown = {'key': ranking_key, 'count': CANDIDATES_PAGE_SIZE}
+        st.session_state.ranked_shown = shown
+    # Every candidate is re-scored, but only the rows shown so far are built
+    candidates_df, total = matcher.get_ranked_candidates(job_id, weights, must, nice, limit=shown['count'])
+    if must or nice:
+        st.caption(f"{total} candidates match the skill filters")
+    if candidates_df.empty:
+        return
+    st.markdown(render_candidate_cards(matcher.with_resume_links(candidates_df)), unsafe_allow_html=True)
+    if total > shown['count']:
+        st.button("Load more candidates", key="load_more_ranked_candidates", on_click=show_more_ranked_candidates,
+                  args=(shown,))
+
+def _candidate_panel(matcher):
+    st.markdown('<div class="section-header">Top Candidates</div>', unsafe_allow_html=True)
+    
+    if st.session_state.selected_job_id:
+        job_id = st.session_state.selected_job_id
         
-        # Filter jobs by selected category using the DEPARTMENT column from database
-        if selected_category != 'All':
-            jobs_df = jobs_df[jobs_df['DEPARTMENT'] == selected_category]
+        # Skill filters and re-ranking run on the in-memory snapshot; no new warehouse query
+        must, nice = skill_filters(matcher, job_id)
+        weights = ranking_weights() if matcher.get_snapshot() is not None else DEFAULT_WEIGHTS
+        if must or nice or weights != DEFAULT_WEIGHTS:
+            ranked_candidate_list(matcher, job_id, weights, must, nice)
+            return
         
-        # Initialize session state for expanded job and selected job
-        if 'expanded_job_id' not in st.session_state:
-            st.session_state.expanded_job_id = None
-        if 'selected_job_id' not in st.session_state:
-            st.session_state.selected_job_id = None
+        # Only the first page of ranks is fetched; "load more" continues from the last rank shown
+        pages = st.session_state.get('candidate_pages')
+        matcher.tracer.cache('candidate_pages', pages is not None and pages['job_id'] == job_id)
+        if pages is None or pages['job_id'] != job_id:
+            first_page, has_more = matcher.get_candidates_page(job_id)
+            pages = {'job_id': job_id, 'frames': [first_page], 'has_more': has_more}
+            st.session_state.candidate_pages = pages
+        candidates_df = pd.concat(pages['frames'], ignore_index=True)
         
-        # Display all job positions as clickable accordion sections
-        if not jobs_df.empty:
-            for idx, job in jobs_df.iterrows():
-                job_id = job['JOB_ID']
-                # Create unique key combining job_id and index to avoid duplicates
-                unique_key = f"{job_id}_{idx}"
-                is_expanded = st.session_state.expanded_job_id == unique_key
-                
-                # Parse skills - handle both JSON format and comma-separated strings, show only top 3
-                try:
-                    if job['REQUIRED_SKILLS'].startswith('['):
-                        # JSON format
-                        skills = json.loads(job['REQUIRED_SKILLS'])
-                    else:
-                        # Comma-separated string or single value
-                        skills = [skill.strip() for skill in str(job['REQUIRED_SKILLS']).split(',')]
-                    # Limit to top 3 skills
-                    top_skills = [skill for skill in skills if skill][:3]
-                    skills_html = ''.join([f'<span class="skill-tag">{skill}</span>' for skill in top_skills])
-                except:
-                    skills_html = '<span class="skill-tag">Skills not available</span>'
-                
-                # Create clickable job header with department name replacement
-                job_title_display = job['TITLE'].replace('MECHANICALCHEMICALQUALITYENGINEERING', 'Core_Engg').replace('IT', 'Engineering')
-                expand_symbol = "▼" if is_expanded else "▶"
-                if st.button(f"{expand_symbol} {job_title_display}", key=f"toggle_{unique_key}"):
-                    # Toggle expansion - if this job is expanded, collapse it; otherwise expand it and collapse others
-                    if st.session_state.expanded_job_id == unique_key:
-                        st.session_state.expanded_job_id = None
-                        st.session_state.selected_job_id = None
-                    else:
-                        st.session_state.expanded_job_id = unique_key
-                        st.session_state.selected_job_id = job_id  # Still use original job_id for candidate lookup
-                    st.rerun()
-                
-                # Show job details if this job is expanded
-                if is_expanded:
-                    st.markdown(f'''
-                    <div class="job-card selected" style="margin-top: -0.5rem; margin-bottom: 1rem;">
-                        <div style="color: #8b949e; font-size: 0.9rem; line-height: 1.4; margin-bottom: 1rem;">
-                            {job['DESCRIPTION']}
-                        </div>
-                        <div style="margin-bottom: 1rem;">
-                            <strong style="color: #ffffff; font-size: 0.9rem;">Required Skills:</strong>
-                        </div>
-                        <div style="display: flex; flex-wrap: wrap; gap: 0.5rem;">
-                            {skills_html}
-                        </div>
-                    </div>
-                    ''', unsafe_allow_html=True)
+        if not candidates_df.empty:
+            st.markdown(render_candidate_cards(matcher.with_resume_links(candidates_df)), unsafe_allow_html=True)
+            if pages['has_more']:
+                st.button("Load more candidates", key="load_more_candidates", on_click=load_more_candidates,
+                          args=(matcher, pages, int(candidates_df['RANK'].iloc[-1])))
         else:
-            st.write("No jobs available")
+            st.markdown('<div style="text-align: center; color: #8b949e; padding: 2rem;">No candidates found for this position.</div>', unsafe_allow_html=True)
+    else:
+        st.markdown('<div style="text-align: center; color: #8b949e; padding: 2rem;">Select a job to view candidates.</div>', unsafe_allow_html=True)
+
+def main():
+    # Page configuration
+    st.set_page_config(
+        page_title="Resume Matcher",
+        page_icon="📋",
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+    
+    # Initialize matcher (shared across reruns and sessions)
+    matcher = get_matcher()
+    with matcher.tracer.rerun('app'):
+        render_app(matcher)
+    
+    if debug_enabled():
+        debug_panel(matcher.tracer)
+
+def render_app(matcher):
+    """Title and the two panels"""
+    # Main title
+    st.markdown('<h1 class="main-title">Resume Matcher</h1>', unsafe_allow_html=True)
     
-    with col2:
-        st.markdown('<div class="section-header">Top Candidates</div>', unsafe_allow_html=True)
-        
-        if st.session_state.selected_job_id:
-            # Get candidates for selected job
-            candidates_df = matcher.get_candidates(st.session_state.selected_job_id)
-            
-            if not candidates_df.empty:
-                # Display all candidates
-                for _, candidate in candidates_df.iterrows():
-                    rank_class = f"rank-{candidate['RANK']}"
-                    
-                    # Prepare resume button HTML
-                    resume_button_html = ""
-                    if 'FILE_URL_CLICKABLE' in candidate and candidate['FILE_URL_CLICKABLE']:
-                        resume_button_html = f'''
-                        <div style="margin-top: 1rem;">
-                            <a href="{candidate['FILE_URL_CLICKABLE']}" target="_blank" style="text-decoration: none;">
-                                <button style="
-                                    background: linear-gradient(135deg, #238636 0%, #2ea043 100%);
-                                    color: white;
-                                    border: 1px solid #2ea043;
-                                    border-radius: 6px;
-                                    padding: 0.5rem 1rem;
-                                    font-size: 0.9rem;
-                                    font-weight: 500;
-                                    cursor: pointer;
-                                    transition: all 0.2s ease;
-                                " onmouseover="this.style.background='linear-gradient(135deg, #2ea043 0%, #34d058 100%)'; this.style.transform='translateY(-1px)'" 
-                                   onmouseout="this.style.background='linear-gradient(135deg, #238636 0%, #2ea043 100%)'; this.style.transform='translateY(0)'">
-                                    📄 View Resume
-                                </button>
-                            </a>
-                        </div>
-                        '''
-                    elif 'FILE_PATH' in candidate and candidate['FILE_PATH']:
-                        resume_button_html = f'''
-                        <div style="margin-top: 1rem; color: #8b949e; font-size: 0.8rem;">
-                            📁 Resume: {candidate['FILE_PATH']}
-                        </div>
-                        '''
-                    
-                    # Display candidate card with embedded button
-                    st.markdown(f'''
-                        <div class="candidate-card">
-                            <div class="candidate-header">
-                                <div>
-                                    <div class="candidate-name">{candidate['NAME']}</div>
-                                    <div class="candidate-info">Current Role: {candidate['CURRENT_ROLE']}</div>
-                                    <div class="candidate-info">Experience: {candidate.get('YEARS_EXPERIENCE', 0)} years</div>
-                                </div>
-                                <div class="rank-badge {rank_class}">
-                                    #{candidate['RANK']}
-                                </div>
-                            </div>
-                            <div class="match-score">
-                                {candidate['MATCH_SCORE']:.0f}% Match
-                            </div>
-                            {resume_button_html}
-                        </div>
-                    ''', unsafe_allow_html=True)
-            else:
-                st.markdown('<div style="text-align: center; color: #8b949e; padding: 2rem;">No candidates found for this position.</div>', unsafe_allow_html=True)
-        else:
-            st.markdown('<div style="text-align: center; color: #8b949e; padding: 2rem;">Select a job to view candidates.</div>', unsafe_allow_html=True)
+    # Initialize session state for expanded job and selected job
+    if 'expanded_job_id' not in st.session_state:
+        st.session_state.expanded_job_id = None
+    if 'selected_job_id' not in st.session_state:
+        st.session_state.selected_job_id = None
+    
+    matcher_panels(matcher)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file